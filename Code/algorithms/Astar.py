@@ -1,7 +1,7 @@
 from ..classes.RushClass import RushHour
 from ..classes.VehicleClass import Vehicle
 import heapq
-from typing import Optional, List, Set, Dict, Union
+from typing import Optional, List, Set, Dict, Union, Tuple, FrozenSet
 
 class HeapItem:
     """
@@ -25,12 +25,16 @@ class Astar:
     """
     Implements a weighted A* search algorithm for solving the Rush Hour puzzle, 
     using heuristics based on the cost of cars blocking the red car, the length
-    of these cars, and the distance of the red car to the exit.
+    of these cars, and the distance of the red car to the exit. Besides this
+    fast mode, the search can order states by g + w * h with an admissible
+    heuristic, which is optimal for w = 1.
 
     Attributes:
     ---------------------------------------------------------------------------
         begin_state (RushHour): The initial state of the Rush Hour game.
         vehicles (Set[Vehicle]): A set of vehicles in the game.
+        vehicle_index (Dict[str, int]): Index of every vehicle id in the
+        sorted vehicle lists of the states.
     """
 
     def __init__(self, begin_state: RushHour) -> None:
@@ -43,6 +47,7 @@ class Astar:
         """
         self.begin_state = begin_state
         self.vehicles = begin_state.vehicles
+        self.vehicle_index = {v.id: i for i, v in enumerate(self.vehicles)}
 
     def is_blocking(self, v: Vehicle, blocker: Vehicle) -> bool:
         """
@@ -120,6 +125,53 @@ class Astar:
             return blocker.x == target.x + target.length or\
                 blocker.x == target.x - 1
         
+    def blocking_graph(self, state: RushHour) -> Tuple[FrozenSet[int], ...]:
+        """
+        Get for every vehicle the indices of the vehicles blocking it. The
+        graph is cached on the state. A child only differs from its parent in
+        the moved vehicle, so its graph is the parent's graph with just the
+        relations of the moved vehicle checked again.
+
+        Args:
+        -----------------------------------------------------------------------
+            state (RushHour): The Rush Hour game state.
+
+        Returns:
+        -----------------------------------------------------------------------
+            Tuple[FrozenSet[int], ...]: Per vehicle, the indices of the
+            vehicles blocking it.
+        """
+        # walk up to the closest state with a graph, e.g. the expanded state
+        # when evaluating the look ahead states
+        chain = []
+        while state.blocked_by is None:
+            chain.append(state)
+            if state.parent is None or state.moved is None:
+                break
+            state = state.parent
+
+        for state in reversed(chain):
+            vehicles = state.vehicles
+            if state.parent is None or state.moved is None:
+                state.blocked_by = tuple(
+                    frozenset(j for j, blocker in enumerate(vehicles)
+                              if self.is_blocking(v, blocker))
+                    for v in vehicles)
+                continue
+            moved = state.moved
+            moved_vehicle = vehicles[moved]
+            graph = list(state.parent.blocked_by)
+            graph[moved] = frozenset(j for j, blocker in enumerate(vehicles)
+                                     if self.is_blocking(moved_vehicle, blocker))
+            for i, v in enumerate(vehicles):
+                # only update the vehicles the moved vehicle starts or stops
+                # blocking
+                if i != moved and\
+                        bool(self.is_blocking(v, moved_vehicle)) != (moved in graph[i]):
+                    graph[i] = graph[i] ^ {moved}
+            state.blocked_by = tuple(graph)
+        return state.blocked_by
+
     def blocking_cars_iterative(self, state: RushHour, max_depth: int)\
                                                         -> Set[Vehicle]:
         """
@@ -135,30 +187,26 @@ class Astar:
         -----------------------------------------------------------------------
             Set[Vehicle]: A set of all vehicles blocking other vehicles.
         """
-        # keep track of the vehicles already considered as blockers
-        already_considered = set()
+        blocked_by = self.blocking_graph(state)
         # start with the cars directly blocking the red car as current blockers
-        current_level_blockers = set(state.blockers)
-
-        all_blockers = set(current_level_blockers)
-        already_considered.update(current_level_blockers)
+        current_level_blockers = {self.vehicle_index[v.id] for v in state.blockers}
+        # keep track of the vehicles already considered as blockers
+        already_considered = set(current_level_blockers)
 
         for depth in range(2, max_depth + 1):
             next_level_blockers = set()
             # iterate through current blockers to find what cars block the cars
             # in current_blockers
             for blocker in current_level_blockers:
-                for v in state.vehicles:
-                    if self.is_blocking(blocker, v) and\
-                                v not in already_considered:
+                for v in blocked_by[blocker]:
+                    if v not in already_considered:
                         # add new found blocking car
                         next_level_blockers.add(v)
                         already_considered.add(v)
-
             current_level_blockers = next_level_blockers
-            # add current blockers to all blockers
-            all_blockers.update(current_level_blockers)
-        return all_blockers
+
+        vehicles = state.vehicles
+        return {vehicles[v] for v in already_considered}
     
     def three_long_blockers(self, state: RushHour) -> int:
         """
@@ -225,6 +273,62 @@ class Astar:
         return blocking_cost * blocker_weight + distance_cost * distance_weight +\
                     extra_cost_long_cars * length_weight
     
+    def admissible_heuristic(self, state: RushHour, slide: bool =False) -> int:
+        """
+        Calculate a lower bound on the steps (or slides) left from a state.
+        The red car has to cover its distance to the exit, every car blocking
+        it has to move at least far enough to clear the exit row, and a car
+        that obstructs a blocker in every direction it can clear in has to
+        move at least once. These are all different cars, so the bounds add up.
+
+        Args:
+        -----------------------------------------------------------------------
+            state (RushHour): The Rush Hour game state.
+            slide (bool): Count slides instead of single steps.
+
+        Returns:
+        -----------------------------------------------------------------------
+            int: The admissible heuristic cost of the state.
+        """
+        red_car = state.red_car
+        exit_row = red_car.y
+        distance = state.dim_board - red_car.x - red_car.length
+        if distance == 0:
+            return 0
+
+        # map the occupied tiles to the vehicles occupying them
+        occupant = {}
+        for v in state.vehicles:
+            for i in range(v.length):
+                tile = (v.x + i, v.y) if v.orientation == 'H' else (v.x, v.y + i)
+                occupant[tile] = v.id
+
+        cost = 1 if slide else distance
+        required = set()
+        for v in state.vehicles:
+            # vertical cars crossing the exit row in front of the red car
+            if v.orientation != 'V' or v.x < red_car.x + red_car.length or\
+                    not v.y <= exit_row < v.y + v.length:
+                continue
+            options = []
+            # clear the row towards y = 0
+            new_y = exit_row - v.length
+            if new_y >= 0:
+                options.append((v.y - new_y, range(new_y, v.y)))
+            # clear the row towards y = dim - 1
+            new_y = exit_row + 1
+            if new_y + v.length <= state.dim_board:
+                options.append((new_y - v.y, range(v.y + v.length, new_y + v.length)))
+            if not options:
+                cost += 1
+                continue
+            cost += 1 if slide else min(steps for steps, _ in options)
+            # the cars in the way of every option have to move as well
+            obstructing = [{occupant[(v.x, y)] for y in tiles if (v.x, y) in occupant}
+                           for _, tiles in options]
+            required.update(set.intersection(*obstructing))
+        return cost + len(required)
+
     def reconstruct_path(self, end_state: RushHour) -> List[RushHour]:
         """
         Reconstruct the solution path from the end state.
@@ -249,7 +353,8 @@ class Astar:
             current_state = current_state.parent
         return path
             
-    def astar_search(self, initial_state: RushHour, max_iterations: int=100000000)\
+    def astar_search(self, initial_state: RushHour, max_iterations: int=100000000,\
+                slide: bool =False, mode: str ='fast', weight: float =1.0)\
                 -> Optional[Dict[str, Union[int, List[RushHour]]]]:
         """
         Performs A* search algorithm to solve the Rush Hour game.
@@ -259,12 +364,23 @@ class Astar:
             initial_state (RushHour): The initial state of the game.
             max_iterations (int): The maximum number of iterations for the
             search.
+            slide (bool): Expand multi-cell slides instead of single steps.
+            mode (str): 'fast' orders the states by total_cost_function only,
+            'weighted' by g + weight * h with the admissible heuristic and
+            'optimal' by g + h, which finds a shortest solution.
+            weight (float): The weight w of the heuristic in 'weighted' mode.
 
         Returns:
         -----------------------------------------------------------------------
             Optional[List[RushHour]]: The solution path if found,
             None otherwise.
         """
+        if mode == 'optimal':
+            return self.weighted_astar_search(initial_state, max_iterations,\
+                                              slide, 1.0)
+        if mode == 'weighted':
+            return self.weighted_astar_search(initial_state, max_iterations,\
+                                              slide, weight)
         solution_path = []
         # calculate heuristic function of the starting state
         open_states = [HeapItem(self.total_cost_function(initial_state),\
@@ -297,7 +413,7 @@ class Astar:
             # generate states to be visited, with option to generate look-ahead
             # states specified by depth
             future_states = current_state.generate_future_states(current_state,\
-                                                                 depth=1)
+                                                        depth=1, slide=slide)
             for state in future_states:
                 # if a state is directly solvable, assign low cost to add to 
                 # the front of the list
@@ -314,4 +430,61 @@ class Astar:
             iterations += 1
         # if no more states to be visited, return None
         print("No solution found")
-        return None
\ No newline at end of file
+        return None
+
+    def weighted_astar_search(self, initial_state: RushHour,\
+                max_iterations: int =100000000, slide: bool =False,\
+                weight: float =1.0) -> Optional[Dict[str, Union[int, List[RushHour]]]]:
+        """
+        Performs A* search ordered by f = g + weight * h, where g is the
+        number of steps taken and h the admissible heuristic. A state is
+        pushed again whenever a shorter path to it is found, so the first
+        solved state popped is optimal for weight 1, and at most weight times
+        the optimal length otherwise.
+
+        Args:
+        -----------------------------------------------------------------------
+            initial_state (RushHour): The initial state of the game.
+            max_iterations (int): The maximum number of iterations for the
+            search.
+            slide (bool): Expand multi-cell slides instead of single steps.
+            weight (float): The weight w of the heuristic.
+
+        Returns:
+        -----------------------------------------------------------------------
+            Optional[Dict[str, Union[int, List[RushHour]]]]: The number of
+            expanded states and the solution path if found, None otherwise.
+        """
+        # best known number of steps to every discovered state
+        best_cost = {initial_state: 0}
+        # ties are broken in favour of the deepest state
+        h = self.admissible_heuristic(initial_state, slide)
+        open_states = [HeapItem((weight * h, 0), initial_state)]
+        iterations = 0
+
+        while open_states:
+            if iterations >= max_iterations:
+                print("Maximum iterations reached")
+                break
+            item = heapq.heappop(open_states)
+            current_state = item.rush_hour_obj
+            cost = -item.priority[1]
+            # skip entries of states that were reached faster since
+            if cost > best_cost[current_state]:
+                continue
+
+            if current_state.is_solved():
+                return {'visited': iterations,
+                        'solution': self.reconstruct_path(current_state)}
+
+            for state in current_state.generate_future_states(current_state,\
+                                                        depth=1, slide=slide):
+                new_cost = cost + 1
+                if new_cost < best_cost.get(state, new_cost + 1):
+                    best_cost[state] = new_cost
+                    h = self.admissible_heuristic(state, slide)
+                    heapq.heappush(open_states,\
+                        HeapItem((new_cost + weight * h, -new_cost), state))
+            iterations += 1
+        print("No solution found")
+        return None
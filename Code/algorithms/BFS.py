@@ -1,69 +1,526 @@
-from collections import deque
+import numpy as np
 from ..classes.RushClass import RushHour
-from typing import Union, Dict, List
+from ..classes.StateCodecClass import StateCodec
+from ..classes.VisitedSetClass import VisitedSet
+from ..classes.BatchEngineClass import BatchEngine
+from typing import Union, Dict, Tuple, List, Optional, Set
 
-def breadth_first_search(RushGame: RushHour, max_depth: int =100)\
-    -> Dict[str, Union[int, List[RushHour], Dict[int, List[RushHour]]]]:
+def track_path(end_state: RushHour, start_state: RushHour)\
+                                                -> Tuple[RushHour, ...]:
+    """
+    Rebuild the path to a state by following the parent pointers back to the
+    start state of the search.
+
+    Args:
+    ---------------------------------------------------------------------------
+        end_state (RushHour): The last state of the path.
+        start_state (RushHour): The state the search started from.
+
+    Returns:
+    ---------------------------------------------------------------------------
+        Tuple[RushHour, ...]: The states from start_state to end_state.
+    """
+    path = [end_state]
+    current_board = end_state
+    while current_board is not start_state:
+        current_board = current_board.parent
+        path.append(current_board)
+    return tuple(reversed(path))
+
+def breadth_first_search(RushGame: RushHour, max_depth: int =100,\
+                                                    slide: bool =False)\
+    -> Dict[str, Union[int, Tuple[RushHour, ...], Dict[int, int]]]:
     """
     Perform a breadth-first search to solve the Rush Hour puzzle.
 
+    Every discovered state keeps a pointer to the state it was discovered
+    from, so the queue only holds states and the solution path is rebuilt once
+    the goal is found.
+
     Args:
     ---------------------------------------------------------------------------
         RushGame (RushGame): An instance of the Rush Hour puzzle game, which 
             should have methods is_solved and moves.
         max_depth (int): The maximum depth to search in the puzzle.
+        slide (bool): Expand multi-cell slides instead of single steps, so
+            the search is optimal in moves rather than steps.
 
     Returns:
     ---------------------------------------------------------------------------
-        Dict[str, Union[int, List[RushHour], Dict[int, List[RushHour]]]]: A 
+        Dict[str, Union[int, Tuple[RushHour, ...], Dict[int, int]]]: A 
         dictionary including the number of visited states, the solution 
-        (if found), and states visited per depth level.
+        (if found), and the number of states discovered per depth level.
     """
     
-    visited_states = set()
-    states_per_depth = {}
-
-    visit_queue = deque()
-    # add the intitial state to the visit_que
-    visit_queue.appendleft((RushGame, tuple()))
-
-    while len(visit_queue) != 0:
-        current_state, path = visit_queue.pop()
-        current_path = path + (current_state,)
-
-        depth = len(current_path)
-        if depth > max_depth:
-            break
-        
-        # check if the state is not already seen
-        if current_state not in visited_states:
-            # add the state to visited states
-            visited_states.add(current_state)
-
-            if current_state.is_solved():
-                solution = current_path
+    visited_states = {RushGame}
+    states_per_depth = {0: 1}
+    solution = (RushGame,) if RushGame.is_solved() else None
+
+    # expand the search one depth level at a time
+    current_level = [RushGame]
+    depth = 1
+    while current_level and solution is None and depth < max_depth:
+        next_level = []
+        for current_state in current_level:
+            next_states = current_state.slide_moves() if slide\
+                                        else current_state.moves()
+            for move in next_states:
+                # deduplicate when the state is discovered, the first
+                # discovery keeps its parent as predecessor
+                if move in visited_states:
+                    continue
+                visited_states.add(move)
+                if move.is_solved():
+                    solution = track_path(move, RushGame)
+                    break
+                next_level.append(move)
+            if solution is not None:
                 break
-            else:
-                # add all possible moves from the state to the queue
-                for move in current_state.moves():
-                    visit_queue.appendleft((move, path + (current_state,)))
+        states_per_depth[depth] = len(next_level) + (solution is not None)
+        current_level = next_level
+        depth += 1
+
     return {
         'visited': len(visited_states),
         'solution': solution,
         'depth_states': states_per_depth
     }
 
+def external_breadth_first_search(RushGame: RushHour, max_depth: int =100,\
+                        slide: bool =False, memory_limit: int =1000000,\
+                        directory: Optional[str] =None)\
+    -> Dict[str, Union[int, Tuple[RushHour, ...], Dict[int, int]]]:
+    """
+    Perform a breadth-first search with a bounded number of states in
+    memory. The states are stored encoded by their StateCodec in a
+    VisitedSet, which spills them to disk when the memory limit is reached,
+    and every depth level is written to disk as a sorted array, so neither
+    the visited states nor the frontier are held in memory.
+
+    New states are checked against the states in memory when they are
+    generated, and against the spilled states once per level, in the style
+    of external-memory BFS. The new states are written to sorted runs of at
+    most memory_limit states, which are merged block by block into the next
+    level while dropping the spilled states. Without parent pointers the solution is rebuilt
+    backwards from the goal, picking at every level a state of the previous
+    level that the current state can be reached from, as moves are
+    reversible.
+
+    Args:
+    ---------------------------------------------------------------------------
+        RushGame (RushGame): An instance of the Rush Hour puzzle game.
+        max_depth (int): The maximum depth to search in the puzzle.
+        slide (bool): Expand multi-cell slides instead of single steps.
+        memory_limit (int): The maximum number of visited states in memory.
+        directory (Optional[str]): Directory for the spilled states and the
+            levels, a temporary directory if None.
+
+    Returns:
+    ---------------------------------------------------------------------------
+        Dict[str, Union[int, Tuple[RushHour, ...], Dict[int, int]]]: A 
+        dictionary including the number of visited states, the solution 
+        (if found), and the number of states discovered per depth level.
+    """
+    codec = StateCodec(RushGame.topology)
+    visited = VisitedSet(codec.width, memory_limit, directory)
+    start = codec.to_bytes(RushGame)
+    visited.add(start)
+    states_per_depth = {0: 1}
+    solution = (RushGame,) if RushGame.is_solved() else None
+
+    levels = [visited.write_run([visited.as_array([start])])]
+    chunks = []
+    goal = None
+    try:
+        depth = 1
+        while solution is None and len(levels[-1]) and depth < max_depth:
+            visited.next_generation()
+            new_keys = []
+            level = levels[-1]
+            # expand the level in slices, so it stays on disk
+            for first in range(0, len(level), 65536):
+                for positions in codec.decode_batch(level[first:first + 65536].tobytes()):
+                    current_state = RushGame.at_positions(positions)
+                    next_states = current_state.slide_moves() if slide\
+                                                else current_state.moves()
+                    for move in next_states:
+                        key = codec.to_bytes(move)
+                        if not visited.add(key):
+                            continue
+                        if move.is_solved():
+                            goal = (move, current_state)
+                            break
+                        new_keys.append(key)
+                        # the keys waiting for the level are also bounded
+                        if len(new_keys) >= visited.memory_limit:
+                            chunks.append(visited.write_run([visited.as_array(new_keys)]))
+                            new_keys = []
+                    if goal is not None:
+                        break
+                if goal is not None:
+                    break
+
+            if goal is not None:
+                # the states discovered in the level so far, as in
+                # breadth_first_search
+                states_per_depth[depth] = len(new_keys) + 1 +\
+                                    sum(len(chunk) for chunk in chunks)
+                solution = track_levels(goal[0], goal[1], levels, codec, slide)
+                solution = (RushGame,) + solution[1:]
+                break
+            chunks.append(visited.write_run([visited.as_array(new_keys)]))
+            new_keys = []
+            levels.append(visited.write_run(visited.filter_spilled(\
+                                            VisitedSet.merge(chunks))))
+            for chunk in chunks:
+                VisitedSet.delete_run(chunk)
+            chunks = []
+            states_per_depth[depth] = len(levels[-1])
+            depth += 1
+    finally:
+        for run in levels + chunks:
+            VisitedSet.delete_run(run)
+        visited.close()
+
+    return {
+        'visited': sum(states_per_depth.values()),
+        'solution': solution,
+        'depth_states': states_per_depth
+    }
+
+def batch_breadth_first_search(RushGame: RushHour, max_depth: int =100,\
+                                                    slide: bool =False)\
+    -> Dict[str, Union[int, Tuple[RushHour, ...], Dict[int, int]]]:
+    """
+    Perform a breadth-first search that expands a whole depth level at once
+    with the BatchEngine, holding the levels as NumPy arrays of positions.
+
+    Moves can be reversed, so the successors of a level that were seen
+    before are all in the level itself or the level before it, and the
+    duplicates are dropped by comparing the sorted keys of these two levels
+    only. The levels are kept with the row of the parent of every state, to
+    rebuild the solution.
+
+    Args:
+    ---------------------------------------------------------------------------
+        RushGame (RushGame): An instance of the Rush Hour puzzle game.
+        max_depth (int): The maximum depth to search in the puzzle.
+        slide (bool): Expand multi-cell slides instead of single steps.
+
+    Returns:
+    ---------------------------------------------------------------------------
+        Dict[str, Union[int, Tuple[RushHour, ...], Dict[int, int]]]: A 
+        dictionary including the number of visited states, the solution 
+        (if found), and the number of states discovered per depth level,
+        where the level of the solution is counted in full.
+    """
+    engine = BatchEngine(RushGame.topology)
+    red = RushGame.topology.red_index
+    exit_position = RushGame.dim_board - RushGame.topology.lengths[red]
+
+    level = np.array([RushGame.positions], dtype=np.uint8)
+    level_keys = engine.keys(level)
+    previous_keys = level_keys[:0]
+    levels = [(level, None)]
+    states_per_depth = {0: 1}
+    solution = (RushGame,) if RushGame.is_solved() else None
+
+    depth = 1
+    while solution is None and len(level) and depth < max_depth:
+        children, parents = engine.successors(level, slide)
+        keys, first = np.unique(engine.keys(children), return_index=True)
+        new = ~(np.isin(keys, level_keys) | np.isin(keys, previous_keys))
+        # keep the states in the order they were generated
+        order = np.sort(first[new])
+        previous_keys, level_keys = level_keys, keys[new]
+        level = children[order]
+        levels.append((level, parents[order]))
+        states_per_depth[depth] = len(level)
+
+        solved = np.flatnonzero(level[:, red] == exit_position)
+        if len(solved):
+            # follow the parent rows back to the start
+            path = []
+            row = solved[0]
+            for positions, parent_rows in reversed(levels[1:]):
+                path.append(RushGame.at_positions(tuple(positions[row].tolist())))
+                row = parent_rows[row]
+            solution = (RushGame,) + tuple(reversed(path))
+        depth += 1
+
+    return {
+        'visited': sum(states_per_depth.values()),
+        'solution': solution,
+        'depth_states': states_per_depth
+    }
+
+def track_levels(goal_state: RushHour, last_state: RushHour,\
+                 levels: List[np.ndarray], codec: StateCodec, slide: bool)\
+                                            -> Tuple[RushHour, ...]:
+    """
+    Rebuild the path to a goal found by external_breadth_first_search. At
+    every level a neighbour of the current state is picked from the sorted
+    states of the level before it.
+
+    Args:
+    ---------------------------------------------------------------------------
+        goal_state (RushHour): The solved state.
+        last_state (RushHour): The state the goal was reached from, in the
+            last level.
+        levels (List[np.ndarray]): The sorted encoded states of every level.
+        codec (StateCodec): The codec of the states.
+        slide (bool): Whether the levels were expanded with slides.
+
+    Returns:
+    ---------------------------------------------------------------------------
+        Tuple[RushHour, ...]: The states from the start to the goal.
+    """
+    path = [goal_state, last_state]
+    current_state = last_state
+    for level in reversed(levels[:-1]):
+        for move in (current_state.slide_moves() if slide else current_state.moves()):
+            key = np.array(codec.to_bytes(move), dtype=level.dtype)
+            index = int(np.searchsorted(level, key))
+            if index < len(level) and level[index] == key:
+                current_state = move
+                break
+        path.append(current_state)
+    return tuple(reversed(path))
+
+def reachable_positions(RushGame: RushHour) -> List[Set[int]]:
+    """
+    Bound the positions every vehicle can reach along its lane. A cell is
+    taken for good by a vehicle if it is covered at every position the
+    vehicle can reach, so the other vehicles never move into it. Starting
+    from the start positions, the vehicles are moved around these cells and
+    the walls until no vehicle reaches a new position. Every reachable state
+    keeps its vehicles within the bounds, and a vehicle that can not move
+    keeps a single position.
+
+    Args:
+    ---------------------------------------------------------------------------
+        RushGame (RushHour): A state of the board.
+
+    Returns:
+    ---------------------------------------------------------------------------
+        List[Set[int]]: The positions every vehicle can reach, in topology
+        order.
+    """
+    topology = RushGame.topology
+    reachable = [{position} for position in RushGame.positions]
+    changed = True
+    while changed:
+        changed = False
+        # the cells every vehicle covers wherever it goes
+        taken = []
+        for masks, positions in zip(topology.masks, reachable):
+            cells = -1
+            for position in positions:
+                cells &= masks[position]
+            taken.append(cells)
+        for i, positions in enumerate(reachable):
+            blocked = topology.wall_bits
+            for j, cells in enumerate(taken):
+                if j != i:
+                    blocked |= cells
+            masks = topology.masks[i]
+            stack = list(positions)
+            while stack:
+                position = stack.pop()
+                for next_position in (position - 1, position + 1):
+                    if 0 <= next_position < len(masks) and next_position not in positions\
+                                    and not masks[next_position] & blocked:
+                        positions.add(next_position)
+                        stack.append(next_position)
+                        changed = True
+    return reachable
+
+def goal_states(RushGame: RushHour, max_states: int =200000,\
+                                    max_bound: int =100000000)\
+                                            -> Optional[List[RushHour]]:
+    """
+    Enumerate the solved states that can be in the same cluster as the given
+    state: the red car at the exit and every other vehicle at a position of
+    its lane it can reach, without overlap with each other or the walls.
+    Vehicles on the same lane can not pass each other, so their order on the
+    lane is kept.
+
+    Before enumerating, the number of goal states is bounded by the product
+    over the lanes of the placements of the vehicles of every lane. Vehicles
+    of crossing lanes rule out most of these placements, so only a bound far
+    beyond max_states gives up right away.
+
+    Args:
+    ---------------------------------------------------------------------------
+        RushGame (RushHour): A state of the board.
+        max_states (int): The maximum number of goal states to enumerate, the
+            enumeration also gives up after trying ten times as many
+            placements.
+        max_bound (int): The maximum of the product of the lane placements.
+
+    Returns:
+    ---------------------------------------------------------------------------
+        Optional[List[RushHour]]: The goal states, or None if the goal set is
+        too large to enumerate.
+    """
+    topology = RushGame.topology
+    start = RushGame.positions
+    red = topology.red_index
+    exit_position = RushGame.dim_board - topology.lengths[red]
+
+    reachable = reachable_positions(RushGame)
+    if exit_position not in reachable[red]:
+        return []
+    candidates = [sorted(positions) for positions in reachable]
+    candidates[red] = [exit_position]
+
+    # place the vehicles lane by lane, in their order on the lane
+    order = sorted(range(len(start)), key=lambda i: (topology.orientations[i],\
+                                                    topology.lanes[i], start[i]))
+    previous_in_lane = {}
+    for previous, i in zip([None] + order, order):
+        if previous is not None and topology.orientations[previous] ==\
+                topology.orientations[i] and topology.lanes[previous] == topology.lanes[i]:
+            previous_in_lane[i] = previous
+
+    def lane_placements(k: int, lowest: int) -> int:
+        # the placements of the k-th vehicle in order and the vehicles after
+        # it on the same lane
+        i = order[k]
+        last = k + 1 == len(order) or previous_in_lane.get(order[k + 1]) != i
+        return sum(1 if last else lane_placements(k + 1, p + topology.lengths[i])
+                   for p in candidates[i]
+                   if p >= lowest and not topology.masks[i][p] & topology.wall_bits)
+
+    bound = 1
+    for k, i in enumerate(order):
+        if i not in previous_in_lane:
+            bound *= lane_placements(k, 0)
+    if bound > max_bound:
+        return None
+
+    positions = list(start)
+    goals = []
+    placements = [0]
+
+    def place(k: int, occupied: int) -> bool:
+        placements[0] += 1
+        if placements[0] > 10 * max_states:
+            return False
+        if k == len(order):
+            goals.append(tuple(positions))
+            return len(goals) <= max_states
+        i = order[k]
+        lowest = 0
+        if i in previous_in_lane:
+            previous = previous_in_lane[i]
+            lowest = positions[previous] + topology.lengths[previous]
+        for p in candidates[i]:
+            mask = topology.masks[i][p]
+            if p >= lowest and not occupied & mask:
+                positions[i] = p
+                if not place(k + 1, occupied | mask):
+                    return False
+        return True
+
+    if not place(0, topology.wall_bits):
+        return None
+    return [RushGame.at_positions(goal) for goal in goals]
+
+def bidirectional_search(RushGame: RushHour, max_depth: int =100,\
+                    slide: bool =False, max_goal_states: int =200000)\
+    -> Dict[str, Union[int, Tuple[RushHour, ...], Dict[int, int]]]:
+    """
+    Perform a bidirectional breadth-first search, expanding from the start
+    state and from the set of goal states at the same time. Moves can be
+    reversed, so the goal side expands with the same moves. The smaller
+    frontier is expanded one depth level at a time, and the level in which
+    the frontiers first meet is finished to keep the solution optimal.
+
+    Args:
+    ---------------------------------------------------------------------------
+        RushGame (RushGame): An instance of the Rush Hour puzzle game.
+        max_depth (int): The maximum depth to search in the puzzle.
+        slide (bool): Expand multi-cell slides instead of single steps.
+        max_goal_states (int): The maximum size of the goal set, larger goal
+            sets fall back to breadth_first_search.
+
+    Returns:
+    ---------------------------------------------------------------------------
+        Dict[str, Union[int, Tuple[RushHour, ...], Dict[int, int]]]: A 
+        dictionary including the number of visited states, the solution 
+        (if found), the number of states discovered per depth level from the
+        start, the size of the goal set and whether the search fell back to
+        breadth_first_search, which has no goal set.
+    """
+    goals = goal_states(RushGame, max_goal_states)
+    if goals is None:
+        results = breadth_first_search(RushGame, max_depth, slide)
+        results['fallback'] = True
+        return results
+
+    # map every discovered state to the stored state and its depth, the
+    # stored states point to their parent towards the start or a goal
+    forward = {RushGame: (RushGame, 0)}
+    backward = {goal: (goal, 0) for goal in goals}
+    states_per_depth = {0: 1}
+    forward_level, backward_level = [RushGame], goals
+    forward_depth = backward_depth = 0
+    meeting = (RushGame, backward[RushGame][0]) if RushGame in backward else None
+
+    while meeting is None and forward_level and backward_level and\
+                        forward_depth + backward_depth < max_depth - 1:
+        expand_forward = len(forward_level) <= len(backward_level)
+        own, other = (forward, backward) if expand_forward else (backward, forward)
+        level = forward_level if expand_forward else backward_level
+        depth = (forward_depth if expand_forward else backward_depth) + 1
+
+        next_level = []
+        best_length = None
+        for current_state in level:
+            next_states = current_state.slide_moves() if slide\
+                                        else current_state.moves()
+            for move in next_states:
+                if move in own:
+                    continue
+                own[move] = (move, depth)
+                next_level.append(move)
+                if move in other:
+                    other_state, other_depth = other[move]
+                    # keep the shortest connection found in this level
+                    if best_length is None or depth + other_depth < best_length:
+                        best_length = depth + other_depth
+                        meeting = (move, other_state) if expand_forward\
+                                                    else (other_state, move)
+
+        if expand_forward:
+            forward_level, forward_depth = next_level, depth
+            states_per_depth[depth] = len(next_level)
+        else:
+            backward_level, backward_depth = next_level, depth
+
+    solution = None
+    if meeting is not None:
+        forward_state, backward_state = meeting
+        path = list(track_path(forward_state, RushGame))
+        # the states on the goal side point towards the goal
+        backward_state = backward_state.parent
+        while backward_state is not None:
+            path.append(backward_state)
+            backward_state = backward_state.parent
+        solution = tuple(path)
+
+    return {
+        'visited': len(forward) + len(backward),
+        'solution': solution,
+        'depth_states': states_per_depth,
+        'goal_states': len(goals),
+        'fallback': False
+    }
+
 # To get a deeper understanding on what happens at each move, we can keep track of the 
 # steps taken at each move with the following code:
 #
-# def track_path(end_state):
-#     current_board = end_state
-#     path = []
-#     while current_board is not None:
-#         path.insert(0, current_board)
-#         current_board = current_board.parent
-#     return path
-
 # def solution_steps(solution_path):
 #     """
 #     Convert a solution path into a list of steps.
@@ -0,0 +1,94 @@
+import heapq
+from ..classes.RushClass import RushHour
+from .Astar import Astar
+from typing import Optional, List, Dict, Union
+
+class BeamSearch(Astar):
+    """
+    Implements beam search for solving the Rush Hour puzzle. The search
+    expands the states one depth at a time like breadth-first search, but
+    only keeps the best states of every depth, ranked by total_cost_function
+    of Astar, so the work and memory per depth are bounded by the beam
+    width. A state seen at an earlier depth is never kept again. A failed
+    search can restart with a wider beam.
+
+    Attributes:
+    ---------------------------------------------------------------------------
+        begin_state (RushHour): The initial state of the Rush Hour game.
+        vehicles (Set[Vehicle]): A set of vehicles in the game.
+    """
+
+    def rank(self, state: RushHour) -> int:
+        """
+        Calculate the rank of a state in the beam, total_cost_function, or a
+        low cost for a state the red car can drive out of, as in astar_search.
+
+        Args:
+        -----------------------------------------------------------------------
+            state (RushHour): The Rush Hour game state.
+
+        Returns:
+        -----------------------------------------------------------------------
+            int: The rank of the state, lower is better.
+        """
+        if state.is_solvable():
+            return -50
+        return self.total_cost_function(state)
+
+    def beam_search(self, initial_state: RushHour, beam_width: int =100,\
+                max_depth: int =1000, slide: bool =False, restarts: int =0,\
+                widen_factor: int =2)\
+                -> Optional[Dict[str, Union[int, List[RushHour]]]]:
+        """
+        Performs beam search to solve the Rush Hour game. When the beam runs
+        empty or reaches the maximum depth, the search starts over with a
+        beam widen_factor times wider, at most restarts times.
+
+        Args:
+        -----------------------------------------------------------------------
+            initial_state (RushHour): The initial state of the game.
+            beam_width (int): The number of states kept per depth.
+            max_depth (int): The maximum depth of the search.
+            slide (bool): Expand multi-cell slides instead of single steps.
+            restarts (int): The maximum number of restarts with a wider beam.
+            widen_factor (int): The factor the beam widens by per restart.
+
+        Returns:
+        -----------------------------------------------------------------------
+            Optional[Dict[str, Union[int, List[RushHour]]]]: The number of
+            expanded states, the solution path and the beam width that found
+            it, or None if no solution is found.
+        """
+        iterations = 0
+        for restart in range(restarts + 1):
+            if initial_state.is_solved():
+                return {'visited': iterations, 'solution': [initial_state],\
+                        'beam_width': beam_width}
+            # the states of all depths, a state is only kept the first time
+            seen = {initial_state}
+            beam = [initial_state]
+
+            for depth in range(max_depth):
+                candidates = []
+                for current_state in beam:
+                    iterations += 1
+                    for state in (current_state.slide_moves() if slide\
+                                                else current_state.moves()):
+                        if state in seen:
+                            continue
+                        if state.is_solved():
+                            return {'visited': iterations,\
+                                    'solution': self.reconstruct_path(state),\
+                                    'beam_width': beam_width}
+                        seen.add(state)
+                        candidates.append(state)
+                if not candidates:
+                    break
+                # keep the best states, ties in the order they were generated
+                beam = heapq.nsmallest(beam_width, candidates, key=self.rank)
+
+            if restart < restarts:
+                print(f"No solution found with beam width {beam_width}, widening")
+                beam_width *= widen_factor
+        print("No solution found")
+        return None
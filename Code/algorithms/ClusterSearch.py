@@ -0,0 +1,46 @@
+import tempfile
+from ..classes.RushClass import RushHour
+from ..classes.ClusterTableClass import ClusterTable
+from typing import Union, Dict, Tuple, Optional
+
+def cluster_search(RushGame: RushHour, directory: Optional[str] =None,\
+                        slide: bool =False, max_states: int =10000000)\
+    -> Dict[str, Union[int, Tuple[RushHour, ...]]]:
+    """
+    Solve the Rush Hour puzzle with the distance table of its cluster. The
+    table is built and stored the first time a state of the cluster is
+    solved, after that a solve only looks up the distances of the states on
+    the path and of their neighbours, and the solution is optimal. Without
+    a directory the table is built in a temporary directory and dropped
+    after the solve.
+
+    Args:
+    ---------------------------------------------------------------------------
+        RushGame (RushGame): An instance of the Rush Hour puzzle game.
+        directory (Optional[str]): Directory of the stored tables, None to
+            not keep the table.
+        slide (bool): Solve in multi-cell slides instead of single steps.
+        max_states (int): The maximum size of a cluster to build a table for.
+
+    Returns:
+    ---------------------------------------------------------------------------
+        Dict[str, Union[int, Tuple[RushHour, ...]]]: A dictionary including
+        the number of states looked up, the solution (if found) and the
+        number of states in the cluster.
+    """
+    if directory is None:
+        with tempfile.TemporaryDirectory(prefix='clusters-') as directory:
+            return cluster_search(RushGame, directory, slide, max_states)
+
+    table = ClusterTable.find(RushGame, directory, slide)
+    if table is None:
+        table = ClusterTable.build(RushGame, directory, slide, max_states)
+        if table is None:
+            return {'visited': 0, 'solution': None, 'cluster_size': 0}
+
+    solution, lookups = table.descend(RushGame, slide)
+    return {
+        'visited': lookups,
+        'solution': tuple(solution) if solution is not None else None,
+        'cluster_size': len(table)
+    }
@@ -0,0 +1,123 @@
+from ..classes.RushClass import RushHour
+from .Astar import Astar
+from .IDDFS import TranspositionTable
+from typing import Optional, List, Dict, Union
+
+class IDAstar(Astar):
+    """
+    Implements iterative deepening A* for solving the Rush Hour puzzle. Every
+    iteration is a depth-first search bounded by the cost g + h, where h is
+    the heuristic of Astar, so the memory use is bounded by the current path
+    and an optional bounded transposition cache.
+
+    Attributes:
+    ---------------------------------------------------------------------------
+        begin_state (RushHour): The initial state of the Rush Hour game.
+        vehicles (Set[Vehicle]): A set of vehicles in the game.
+    """
+
+    def heuristic(self, state: RushHour) -> int:
+        """
+        Calculate the heuristic estimate of the steps left from a state, based
+        on total_cost_function. The weighted cost can be negative, so it is
+        clipped at zero, and solved states cost nothing.
+
+        Args:
+        -----------------------------------------------------------------------
+            state (RushHour): The Rush Hour game state.
+
+        Returns:
+        -----------------------------------------------------------------------
+            int: The heuristic cost of the state.
+        """
+        if state.is_solved():
+            return 0
+        return max(0, self.total_cost_function(state))
+
+    def ida_star_search(self, initial_state: RushHour, max_iterations: int=100000000,\
+                slide: bool =False, cache_size: int =100000, mode: str ='fast',\
+                weight: float =1.0)\
+                -> Optional[Dict[str, Union[int, List[RushHour]]]]:
+        """
+        Performs IDA* search to solve the Rush Hour game.
+
+        Args:
+        -----------------------------------------------------------------------
+            initial_state (RushHour): The initial state of the game.
+            max_iterations (int): The maximum number of expanded states over
+            all iterations.
+            slide (bool): Expand multi-cell slides instead of single steps.
+            cache_size (int): The maximum number of states in the
+            transposition cache, 0 disables the cache.
+            mode (str): 'fast' bounds the search with the heuristic method,
+            'weighted' with weight times the admissible heuristic and
+            'optimal' with the admissible heuristic, which finds a shortest
+            solution.
+            weight (float): The weight w of the heuristic in 'weighted' mode.
+
+        Returns:
+        -----------------------------------------------------------------------
+            Optional[Dict[str, Union[int, List[RushHour]]]]: The number of
+            expanded states and the solution path if found, None otherwise.
+        """
+        if initial_state.is_solved():
+            return {'visited': 0, 'solution': [initial_state]}
+
+        def next_states(state: RushHour):
+            return state.slide_moves() if slide else state.moves()
+
+        if mode == 'fast':
+            heuristic = self.heuristic
+        else:
+            if mode == 'optimal':
+                weight = 1.0
+            heuristic = lambda state: weight * self.admissible_heuristic(state, slide)
+
+        iterations = 0
+        bound = heuristic(initial_state)
+        # the cache is shared by all iterations, like the table of IDDFS
+        cache = TranspositionTable(cache_size) if cache_size else None
+        while True:
+            next_bound = None
+            path = [initial_state]
+            on_path = {initial_state}
+            stack = [next_states(initial_state)]
+            if cache is not None:
+                cache.prune(initial_state, 0, bound)
+
+            while stack:
+                state = next(stack[-1], None)
+                if state is None:
+                    stack.pop()
+                    on_path.discard(path.pop())
+                    continue
+                # skip cycles back to a state on the current path
+                if state in on_path:
+                    continue
+                cost = len(path)
+                estimate = cost + heuristic(state)
+                # remember the smallest cost over the bound for the next iteration
+                if estimate > bound:
+                    if next_bound is None or estimate < next_bound:
+                        next_bound = estimate
+                    continue
+                if cache is not None and cache.prune(state, cost, bound):
+                    continue
+
+                if state.is_solved():
+                    return {'visited': iterations,
+                            'solution': path + [state]}
+
+                if iterations >= max_iterations:
+                    print("Maximum iterations reached")
+                    return None
+                iterations += 1
+                path.append(state)
+                on_path.add(state)
+                stack.append(next_states(state))
+
+            # if no state exceeded the bound, there is nothing left to explore
+            if next_bound is None:
+                print("No solution found")
+                return None
+            bound = next_bound
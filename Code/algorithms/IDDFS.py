@@ -1,59 +1,128 @@
-from collections import deque
+from collections import OrderedDict
 from ..classes.RushClass import RushHour
-from typing import Union, Dict, List
+from typing import Union, Dict, Tuple
 
-def iterative_deepening_search(RushGame: RushHour, max_depth: int=500)\
-    -> Dict[str, Union[int, List[RushHour], Dict[int, List[RushHour]]]]:
+class TranspositionTable:
     """
-    Performs an iterative deepening search on the Rush Hour game.
+    Bounded table recording the shallowest depth at which each state was
+    seen, and in which iteration of the iterative deepening. When the table
+    is full the least recently used state is evicted.
+
+    Attributes:
+    ---------------------------------------------------------------------------
+        max_size (int): The maximum number of states in the table.
+        entries (OrderedDict): Maps states to (depth, iteration), ordered from
+        least to most recently used.
+    """
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+
+    def prune(self, state: RushHour, depth: int, iteration: int) -> bool:
+        """
+        Check if the subtree of a state reached at depth can be skipped, and
+        record the state otherwise.
+
+        A state seen at a shallower depth is explored from there with a larger
+        remaining depth, in this iteration or an earlier one that has already
+        ended. A state seen at the same depth in this iteration has already
+        been explored with the same remaining depth.
+
+        Args:
+        -----------------------------------------------------------------------
+            state (RushHour): The state reached.
+            depth (int): The number of moves from the start to the state.
+            iteration (int): The current depth limit.
+
+        Returns:
+        -----------------------------------------------------------------------
+            bool: True if the state does not need to be explored.
+        """
+        entry = self.entries.get(state)
+        if entry is not None:
+            seen_depth, seen_iteration = entry
+            self.entries.move_to_end(state)
+            if seen_depth < depth or (seen_depth == depth and\
+                                      seen_iteration == iteration):
+                return True
+        elif len(self.entries) >= self.max_size:
+            self.entries.popitem(last=False)
+        self.entries[state] = (depth, iteration)
+        return False
+
+def iterative_deepening_search(RushGame: RushHour, max_depth: int=500,\
+                        slide: bool =False, max_table_size: int =2000000)\
+    -> Dict[str, Union[int, Tuple[RushHour, ...], Dict[int, int]]]:
+    """
+    Performs an iterative deepening depth-first search on the Rush Hour game.
+
+    Every iteration is a depth-first search with an explicit stack, so only
+    the current path is kept. A bounded transposition table shared by all
+    iterations prunes states that were already reached at a shallower depth.
 
     Args:
     ---------------------------------------------------------------------------
         RushGame (RushGame): An instance of the Rush Hour game.
         max_depth (int, optional): The maximum depth for the search. Defaults to 500.
+        slide (bool, optional): Expand multi-cell slides instead of single
+            steps. Defaults to False.
+        max_table_size (int, optional): The maximum number of states in the
+            transposition table. Defaults to 2000000.
 
     Returns:
     ---------------------------------------------------------------------------
-        Dict[str, Union[int, List[RushHour], Dict[int, List[RushHour]]]]:
-        A dictionary the total visited states, the solution (if found), and 
-        states per depth.
+        Dict[str, Union[int, Tuple[RushHour, ...], Dict[int, int]]]:
+        A dictionary with the states visited in the last iteration, the
+        solution (if found), and the states visited per depth limit.
     """
-    
-    states_per_depth = {}
-    solution = None
-
-    # Iterate over a range of depth levels
-    for depth in range(1, max_depth + 1):
-        visited_states = set()
-        visit_queue = deque([(RushGame, ())])
-
-        # Loop until there are no states left to visit or a solution is found
-        while visit_queue:
-            current_board, path = visit_queue.pop()
-        
-            if current_board in visited_states and len(path) < depth:
-                continue
 
-            visited_states.add(current_board)
-            new_path = path + (current_board,)
+    states_per_depth = {1: 1}
+    solution = (RushGame,) if RushGame.is_solved() else None
+    table = TranspositionTable(max_table_size)
+
+    def next_states(state: RushHour):
+        return state.slide_moves() if slide else state.moves()
+
+    # Iterate over a range of depth levels, a depth counts the states on the
+    # path including the start
+    depth = 1
+    cutoff = True
+    while solution is None and cutoff and depth < max_depth:
+        depth += 1
+        # stop deepening once an iteration no longer reaches its depth limit
+        cutoff = False
+        table.prune(RushGame, 0, depth)
+        visited = 1
+        path = [RushGame]
+        stack = [next_states(RushGame)]
 
-            # Check if the current state is a solution
-            if current_board.is_solved():
-                solution = new_path
+        # Loop until the tree up to this depth is exhausted or a solution is found
+        while stack:
+            move = next(stack[-1], None)
+            if move is None:
+                stack.pop()
+                path.pop()
+                continue
+            if table.prune(move, len(path), depth):
+                continue
+            visited += 1
+
+            # Check if the state is a solution
+            if move.is_solved():
+                solution = tuple(path) + (move,)
                 break
-            
-            # If the path is not yet at maximum depth, extend the search
-            if len(new_path) < depth:
-                for move in current_board.moves():
-                    visit_queue.appendleft((move, new_path))
 
-        states_per_depth[depth] = len(visited_states)
-        if solution:
-            break
+            # If the path is not yet at maximum depth, go deeper
+            if len(path) + 1 < depth:
+                path.append(move)
+                stack.append(next_states(move))
+            else:
+                cutoff = True
+
+        states_per_depth[depth] = visited
 
-    total_visited = sum(states_per_depth.values()) # Calculate the total number of visited states
     return {
-        'visited': len(visited_states),
+        'visited': states_per_depth[depth],
         'solution': solution,
         'depth_states': states_per_depth
     }
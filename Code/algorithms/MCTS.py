@@ -0,0 +1,217 @@
+import math
+import time
+import random
+from ..classes.RushClass import RushHour
+from .Astar import Astar
+from .Random import random_walk, replay_moves
+from .PathShortening import erase_loops
+from typing import Optional, List, Dict, Union
+
+class TreeNode:
+    """
+    A state in the search tree of MCTS. The nodes are kept in a
+    transposition table, so a state reached along different paths has a
+    single node that gathers the statistics of all of them.
+
+    Attributes:
+    ---------------------------------------------------------------------------
+        state (RushHour): The state of the node.
+        children (Optional[List[TreeNode]]): The nodes of the next states,
+        None until the node is expanded.
+        visits (int): Number of simulations through the node.
+        value (float): Sum of the rewards of those simulations.
+    """
+    __slots__ = ('state', 'children', 'visits', 'value')
+
+    def __init__(self, state: RushHour):
+        self.state = state
+        self.children = None
+        self.visits = 0
+        self.value = 0.0
+
+class MCTS(Astar):
+    """
+    Implements Monte Carlo tree search for solving the Rush Hour puzzle. Every
+    simulation selects a path down the tree by UCT, expands a new state and
+    estimates its distance to the exit with a random rollout of bounded
+    depth, optionally scored at the cutoff with total_cost_function of
+    Astar. After a number of
+    simulations the search commits to the most visited next state and
+    continues from there, keeping the statistics of the subtree. The search
+    stops at a number of simulations or a wall-clock time, so its time cost
+    is known in advance.
+
+    Attributes:
+    ---------------------------------------------------------------------------
+        begin_state (RushHour): The initial state of the Rush Hour game.
+        vehicles (Set[Vehicle]): A set of vehicles in the game.
+    """
+
+    def estimate(self, state: RushHour) -> int:
+        """
+        Estimate the steps left from the last state of a rollout, based on
+        total_cost_function. The weighted cost can be negative, so it is
+        clipped at zero, and solved states cost nothing.
+
+        Args:
+        -----------------------------------------------------------------------
+            state (RushHour): The Rush Hour game state.
+
+        Returns:
+        -----------------------------------------------------------------------
+            int: The estimated number of steps left.
+        """
+        if state.is_solved():
+            return 0
+        return max(0, self.total_cost_function(state))
+
+    def mcts_search(self, initial_state: RushHour, iterations: Optional[int] =None,\
+                time_limit: Optional[float] =None, slide: bool =False,\
+                rollout_depth: Optional[int] =None, evaluate: bool =False,\
+                iterations_per_move: int =200, exploration: float =0.3,\
+                seed: Optional[int] =None)\
+                -> Optional[Dict[str, Union[int, List[RushHour]]]]:
+        """
+        Performs Monte Carlo tree search to solve the Rush Hour game. The
+        reward of a simulation is rollout_depth / (rollout_depth + d), where
+        d is the estimated number of steps from a node to the exit, so every
+        node of the path gets the reward of its own distance.
+
+        Args:
+        -----------------------------------------------------------------------
+            initial_state (RushHour): The initial state of the game.
+            iterations (Optional[int]): The maximum number of simulations,
+            None to only stop at the time limit, or at 50000 simulations
+            without a time limit.
+            time_limit (Optional[float]): The maximum wall-clock time of the
+            search in seconds, None for no limit.
+            slide (bool): Search with multi-cell slides instead of single
+            steps.
+            rollout_depth (Optional[int]): The maximum number of steps of a
+            rollout, ten times the dimension of the board if None.
+            evaluate (bool): Add the estimate of total_cost_function to a
+            rollout that does not solve the puzzle, instead of counting it as
+            twice the rollout depth.
+            iterations_per_move (int): The number of simulations before
+            committing to the next state.
+            exploration (float): The exploration constant of UCT.
+            seed (Optional[int]): Seed of the rollouts, a random seed if None.
+
+        Returns:
+        -----------------------------------------------------------------------
+            Optional[Dict[str, Union[int, List[RushHour]]]]: The number of
+            states in the tree and the shortest solution found, or None if
+            no solution is found within the budget.
+        """
+        start_time = time.perf_counter()
+        rng = random.Random(seed)
+        topology = initial_state.topology
+        if rollout_depth is None:
+            rollout_depth = 10 * initial_state.dim_board
+        if iterations is None and time_limit is None:
+            iterations = 50000
+
+        # one node per state, whichever path reaches it
+        table = {}
+        def node_of(state: RushHour) -> TreeNode:
+            node = table.get(state.positions)
+            if node is None:
+                node = table[state.positions] = TreeNode(state)
+            return node
+
+        root = node_of(initial_state)
+        committed = [initial_state]
+        on_committed = {initial_state.positions}
+        best = None
+        simulations = 0
+
+        def out_of_budget() -> bool:
+            return (iterations is not None and simulations >= iterations) or\
+                (time_limit is not None and\
+                            time.perf_counter() - start_time >= time_limit)
+
+        while not root.state.is_solved() and not out_of_budget():
+            for _ in range(iterations_per_move):
+                if out_of_budget():
+                    break
+                simulations += 1
+
+                # selection, avoiding the states already on the path
+                descent = [root]
+                on_path = set(on_committed)
+                node = root
+                dead_end = False
+                while node.visits and not node.state.is_solved():
+                    if node.children is None:
+                        moves = node.state.slide_moves() if slide else node.state.moves()
+                        node.children = [node_of(move) for move in moves]
+                    candidates = [child for child in node.children\
+                                  if child.state.positions not in on_path]
+                    if not candidates:
+                        dead_end = True
+                        break
+                    unvisited = [child for child in candidates if not child.visits]
+                    if unvisited:
+                        node = rng.choice(unvisited)
+                    else:
+                        log_visits = math.log(node.visits)
+                        node = max(candidates, key=lambda child: child.value / child.visits +\
+                                   exploration * math.sqrt(log_visits / child.visits))
+                    descent.append(node)
+                    on_path.add(node.state.positions)
+
+                # rollout from the new state
+                rollout = None
+                if node.state.is_solved():
+                    rollout = []
+                    distance = 0
+                elif dead_end:
+                    # every next state is already on the path
+                    distance = 2 * rollout_depth
+                else:
+                    positions = list(node.state.positions)
+                    rollout = random_walk(topology, positions, slide, rng,\
+                                          rollout_depth + 1)
+                    if rollout is not None:
+                        distance = len(rollout)
+                    elif evaluate:
+                        distance = rollout_depth +\
+                            self.estimate(node.state.at_positions(tuple(positions)))
+                    else:
+                        distance = 2 * rollout_depth
+
+                # keep the shortest solution, without its cycles
+                if rollout is not None:
+                    path = committed + [n.state for n in descent[1:]]
+                    path += replay_moves(node.state, rollout)[1:]
+                    path = erase_loops(path)
+                    if best is None or len(path) < len(best):
+                        best = path
+
+                # backpropagation, a node further up is a step further away
+                for steps, n in enumerate(reversed(descent)):
+                    n.visits += 1
+                    n.value += rollout_depth / (rollout_depth + distance + steps)
+
+            # commit to the most visited next state, keeping its subtree
+            if root.children is None:
+                continue
+            candidates = [child for child in root.children\
+                          if child.state.positions not in on_committed and child.visits]
+            if candidates:
+                root = max(candidates, key=lambda child: child.visits)
+                committed.append(root.state)
+                on_committed.add(root.state.positions)
+                continue
+            # a dead end, step back and keep it out of the search
+            committed.pop()
+            if not committed:
+                break
+            root = node_of(committed[-1])
+
+        if root.state.is_solved() and (best is None or len(committed) < len(best)):
+            best = committed
+        if best is None:
+            print("No solution found")
+            return None
+        return {'visited': len(table), 'solution': best}
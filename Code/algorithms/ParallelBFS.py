@@ -0,0 +1,290 @@
+import time
+from threading import Thread
+from multiprocessing import Process, Pipe
+from multiprocessing.connection import Connection, wait
+from ..classes.RushClass import RushHour
+from ..classes.BitboardClass import BitboardRushHour
+from typing import Union, Dict, Tuple, List, Optional
+
+def shard_of(positions: Tuple[int, ...], workers: int) -> int:
+    """
+    Get the worker that owns a state. The hash of a tuple of integers is the
+    same in every process, so all workers agree on the owner.
+
+    Args:
+    ---------------------------------------------------------------------------
+        positions (Tuple[int, ...]): Free coordinate of every vehicle.
+        workers (int): The number of workers.
+
+    Returns:
+    ---------------------------------------------------------------------------
+        int: The index of the owning worker.
+    """
+    return hash(positions) % workers
+
+def receive(connections: List[Connection], processes: List[Process],\
+                                            timeout: float =1.0) -> list:
+    """
+    Receive a reply from every given worker, checking every timeout seconds
+    that all workers are still alive. A worker waits for the buckets of every
+    other worker, so when one worker dies the others stop replying too, and
+    the other workers inherit the end of its pipe, so its death does not
+    always close the pipe. Without the checks the main process would wait
+    forever.
+
+    Args:
+    ---------------------------------------------------------------------------
+        connections (List[Connection]): Pipes to the workers to receive from.
+        processes (List[Process]): All worker processes.
+        timeout (float): Seconds between the checks of the workers.
+
+    Returns:
+    ---------------------------------------------------------------------------
+        list: The messages sent by the workers, in the order of connections.
+
+    Raises:
+    ---------------------------------------------------------------------------
+        RuntimeError: If a worker died before all replies arrived.
+    """
+    replies = {}
+    while len(replies) < len(connections):
+        waiting = [connection for connection in connections if connection not in replies]
+        for connection in wait(waiting, timeout):
+            try:
+                replies[connection] = connection.recv()
+            except (EOFError, OSError):
+                raise RuntimeError("A ParBFS worker closed its pipe")
+        for process in processes:
+            if not process.is_alive():
+                raise RuntimeError(f"ParBFS worker {process.name} exited with code {process.exitcode}")
+    return [replies[connection] for connection in connections]
+
+def bfs_worker(RushGame: RushHour, index: int, workers: int, slide: bool,\
+                connection: Connection, outboxes: List[Optional[Connection]],\
+                inboxes: List[Optional[Connection]]) -> None:
+    """
+    Worker process of the parallel breadth-first search. It owns the visited
+    states of its shard, with their parents, and the part of the current
+    layer that falls in its shard.
+
+    Every layer it drops the states discovered for its shard that it has
+    seen before, and expands the new ones. The children are bucketed by the
+    shard that owns them, and the buckets are exchanged with the other
+    workers directly, so the main process only receives the counts of the
+    layer. The states are rebuilt from their positions as bitboards, which
+    is cheaper than rebuilding the vehicles of a RushHour state.
+
+    Args:
+    ---------------------------------------------------------------------------
+        RushGame (RushHour): The initial state, used to create the states
+            from their positions.
+        index (int): The shard of the worker.
+        workers (int): The number of workers.
+        slide (bool): Expand multi-cell slides instead of single steps.
+        connection (Connection): Pipe to the main process.
+        outboxes (List[Optional[Connection]]): Pipe to every other worker,
+            None for the worker itself.
+        inboxes (List[Optional[Connection]]): Pipe from every other worker,
+            None for the worker itself.
+    """
+    topology = RushGame.topology
+    red = topology.red_index
+    exit_position = RushGame.dim_board - topology.lengths[red]
+    # parent positions of every state in the shard, None for the start
+    parents = {}
+    # the states discovered for the shard in the last layer
+    discovered = []
+
+    def send_buckets(buckets: List[Dict[Tuple[int, ...], Tuple[int, ...]]]) -> None:
+        for shard, outbox in enumerate(outboxes):
+            if outbox is not None:
+                outbox.send(list(buckets[shard].items()))
+
+    while True:
+        message = connection.recv()
+        if message is None:
+            break
+        command, data = message
+
+        if command == 'parent':
+            connection.send(parents.get(data))
+            continue
+
+        # deduplicate the discovered states, the first discovery keeps its
+        # parent as predecessor
+        layer = []
+        solved = None
+        for positions, parent in data + discovered:
+            if positions in parents:
+                continue
+            parents[positions] = parent
+            layer.append(positions)
+            if solved is None and positions[red] == exit_position:
+                solved = positions
+
+        buckets = [{} for _ in range(workers)]
+        if solved is None:
+            for positions in layer:
+                state = BitboardRushHour(topology, positions)
+                next_states = state.slide_moves() if slide else state.moves()
+                for move in next_states:
+                    child = move.positions
+                    buckets[shard_of(child, workers)].setdefault(child, positions)
+
+        # send while receiving, so full pipes can not block the exchange
+        sender = Thread(target=send_buckets, args=(buckets,))
+        sender.start()
+        discovered = list(buckets[index].items())
+        for inbox in inboxes:
+            if inbox is not None:
+                discovered.extend(inbox.recv())
+        sender.join()
+        connection.send((len(layer), len(parents), solved))
+
+def parallel_breadth_first_search(RushGame: RushHour, max_depth: int =100,\
+                                        slide: bool =False, workers: int =2)\
+    -> Dict[str, Union[int, Tuple[RushHour, ...], Dict[int, Union[int, float]]]]:
+    """
+    Perform a level-synchronous breadth-first search with the states sharded
+    over worker processes by their hash.
+
+    Each worker keeps the visited states of its shard and expands the states
+    of the current layer it owns. The workers send the children straight to
+    the workers that own them, so every state is deduplicated by exactly
+    one worker, and the main process only counts the states of every layer
+    and decides when to stop. The layers are the same as in
+    breadth_first_search, so the solution has the same optimal number of
+    steps.
+
+    Args:
+    ---------------------------------------------------------------------------
+        RushGame (RushGame): An instance of the Rush Hour puzzle game, which
+            should have methods at_positions and moves.
+        max_depth (int): The maximum depth to search in the puzzle.
+        slide (bool): Expand multi-cell slides instead of single steps, so
+            the search is optimal in moves rather than steps.
+        workers (int): The number of worker processes.
+
+    Returns:
+    ---------------------------------------------------------------------------
+        Dict[str, Union[int, Tuple[RushHour, ...], Dict[int, Union[int, float]]]]:
+        A dictionary including the number of visited states, the solution
+        (if found), the number of states discovered per depth level and the
+        time spent on every depth level in seconds.
+    """
+    workers = max(1, workers)
+    # a one-way pipe from every worker to every other worker
+    outboxes = [[None] * workers for _ in range(workers)]
+    inboxes = [[None] * workers for _ in range(workers)]
+    for sender in range(workers):
+        for receiver in range(workers):
+            if sender != receiver:
+                inboxes[receiver][sender], outboxes[sender][receiver] =\
+                                                        Pipe(duplex=False)
+    connections = []
+    processes = []
+    child_connections = []
+    for index in range(workers):
+        parent_connection, child_connection = Pipe()
+        process = Process(target=bfs_worker,\
+                          args=(RushGame, index, workers, slide, child_connection,\
+                                outboxes[index], inboxes[index]))
+        process.daemon = True
+        process.start()
+        connections.append(parent_connection)
+        processes.append(process)
+        child_connections.append(child_connection)
+    # the workers hold their own ends, closing the copies of the main
+    # process lets it see the end of a pipe when a worker dies
+    for connection in child_connections:
+        connection.close()
+    for pipe_end in (end for ends in outboxes + inboxes for end in ends):
+        if pipe_end is not None:
+            pipe_end.close()
+
+    states_per_depth = {}
+    time_per_depth = {}
+    visited = 0
+    solution = None
+    try:
+        # the start state is the only state of depth 0
+        start = RushGame.positions
+        incoming = [[] for _ in range(workers)]
+        incoming[shard_of(start, workers)].append((start, None))
+        depth = 0
+        while depth < max_depth:
+            start_time = time.perf_counter()
+            for connection, data in zip(connections, incoming):
+                connection.send(('layer', data))
+            incoming = [[] for _ in range(workers)]
+            replies = receive(connections, processes)
+
+            layer_size = 0
+            visited = 0
+            solved = None
+            for size, shard_size, shard_solved in replies:
+                layer_size += size
+                visited += shard_size
+                if solved is None and shard_solved is not None:
+                    solved = shard_solved
+            states_per_depth[depth] = layer_size
+            time_per_depth[depth] = time.perf_counter() - start_time
+
+            if solved is not None:
+                solution = track_positions(solved, connections, processes)
+                break
+            if not layer_size:
+                break
+            depth += 1
+    except BaseException:
+        # the other workers wait on the buckets of a worker that died, so
+        # they can not read the stop message
+        for process in processes:
+            process.terminate()
+        raise
+    finally:
+        for connection, process in zip(connections, processes):
+            if process.is_alive():
+                try:
+                    connection.send(None)
+                except OSError:
+                    pass
+        for process in processes:
+            process.join()
+
+    if solution is not None:
+        solution = (RushGame,) + tuple(RushGame.at_positions(positions)
+                                       for positions in solution[1:])
+    return {
+        'visited': visited,
+        'solution': solution,
+        'depth_states': states_per_depth,
+        'layer_times': time_per_depth
+    }
+
+def track_positions(end_positions: Tuple[int, ...], connections: List[Connection],\
+                    processes: List[Process]) -> List[Tuple[int, ...]]:
+    """
+    Rebuild the path to a state by asking the owning workers for the parent
+    of every state on the path.
+
+    Args:
+    ---------------------------------------------------------------------------
+        end_positions (Tuple[int, ...]): The positions of the last state.
+        connections (List[Connection]): Pipes to the workers.
+        processes (List[Process]): The worker processes.
+
+    Returns:
+    ---------------------------------------------------------------------------
+        List[Tuple[int, ...]]: The positions from the start to the end state.
+    """
+    path = [end_positions]
+    positions = end_positions
+    while True:
+        shard = shard_of(positions, len(connections))
+        connections[shard].send(('parent', positions))
+        positions = receive([connections[shard]], processes)[0]
+        if positions is None:
+            break
+        path.append(positions)
+    return list(reversed(path))
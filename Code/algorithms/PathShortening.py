@@ -0,0 +1,137 @@
+from ..classes.RushClass import RushHour
+from ..classes.BitboardClass import BitboardRushHour
+from .Random import replay_moves
+from typing import Dict, List, Optional, Tuple
+
+
+def erase_loops(path: List[RushHour]) -> List[RushHour]:
+    """
+    Removes the cycles of a path. Every state is looked up in an index of
+    the states kept so far, and when a state comes back the states after
+    its first visit are dropped, so the path keeps no state twice.
+
+    Args:
+    ---------------------------------------------------------------------------
+        path (List[RushHour]): The states of the path.
+
+    Returns:
+    ---------------------------------------------------------------------------
+        List[RushHour]: The states of the path without cycles, with the same
+        first and last state.
+    """
+    erased = []
+    index = {}
+    for state in path:
+        first_visit = index.get(state.positions)
+        if first_visit is None:
+            index[state.positions] = len(erased)
+            erased.append(state)
+            continue
+        # go back to the first visit of the state
+        for dropped in erased[first_visit + 1:]:
+            del index[dropped.positions]
+        del erased[first_visit + 1:]
+    return erased
+
+
+def shortcut(path: List[RushHour], index: Dict[Tuple[int, ...], int], start: int,\
+                depth: int, slide: bool, max_states: int)\
+                                    -> Optional[Tuple[int, List[Tuple[int, ...]]]]:
+    """
+    Searches the states around a state of a path with a breadth-first
+    search of bounded depth, for a shorter way to a later state of the path.
+
+    Args:
+    ---------------------------------------------------------------------------
+        path (List[RushHour]): The states of the path.
+        index (Dict[Tuple[int, ...], int]): The position of every state on
+            the path.
+        start (int): The position of the state to search from.
+        depth (int): Maximum number of steps of the shortcut.
+        slide (bool): Search with multi-cell slides instead of single steps.
+        max_states (int): Maximum number of states of the search.
+
+    Returns:
+    ---------------------------------------------------------------------------
+        Optional[Tuple[int, List[Tuple[int, ...]]]]: The position of the
+        state the shortcut leads to and the positions of the vehicles of
+        its states, or None if the path can not be shortened from the state.
+    """
+    root = BitboardRushHour(path[start].topology, path[start].positions)
+    parents = {root.positions: None}
+    level = [root]
+    best_gain, best_end, best_state = 0, None, None
+
+    for distance in range(1, depth + 1):
+        next_level = []
+        for state in level:
+            for move in (state.slide_moves() if slide else state.moves()):
+                if move.positions in parents:
+                    continue
+                parents[move.positions] = state.positions
+                next_level.append(move)
+                end = index.get(move.positions)
+                # the steps saved by leaving the path here
+                if end is not None and end - start - distance > best_gain:
+                    best_gain, best_end, best_state = end - start - distance,\
+                                                      end, move.positions
+            if len(parents) > max_states:
+                break
+        if len(parents) > max_states:
+            break
+        level = next_level
+
+    if best_end is None:
+        return None
+    segment = []
+    positions = best_state
+    while positions != root.positions:
+        segment.append(positions)
+        positions = parents[positions]
+    return best_end, segment[::-1]
+
+
+def shorten_path(path: List[RushHour], depth: int =8, slide: bool =False,\
+                                        max_states: int =500) -> List[RushHour]:
+    """
+    Shortens a path without cycles by local searches: from every state a
+    bounded breadth-first search looks for a shorter way to a later state of
+    the path, and the path continues from the state it leads to. A shortcut
+    can bring states closer that were too far apart for a shortcut, so the
+    passes over the path repeat as long as they shorten it. The searches
+    run on bitboard states, whatever the model of the path.
+
+    Args:
+    ---------------------------------------------------------------------------
+        path (List[RushHour]): The states of the path, without cycles.
+        depth (int): Maximum number of steps of a shortcut.
+        slide (bool): Search with multi-cell slides instead of single steps.
+        max_states (int): Maximum number of states of a local search.
+
+    Returns:
+    ---------------------------------------------------------------------------
+        List[RushHour]: The shortened path, with the same first and last
+        state, of the same model as the given path.
+    """
+    while True:
+        index = {state.positions: i for i, state in enumerate(path)}
+        shortened = [path[0].positions]
+        start = 0
+        while start < len(path) - 1:
+            found = shortcut(path, index, start, depth, slide, max_states)
+            if found is None:
+                start += 1
+                shortened.append(path[start].positions)
+            else:
+                start, segment = found
+                shortened.extend(segment)
+        if len(shortened) == len(path):
+            return path
+
+        moves = []
+        for positions, next_positions in zip(shortened, shortened[1:]):
+            vehicle = next(i for i, (p, next_p) in enumerate(zip(positions,\
+                                                next_positions)) if p != next_p)
+            moves.append((vehicle, next_positions[vehicle]))
+        # a shortcut can pass a state the path visited before the shortcut
+        path = erase_loops(replay_moves(path[0], moves))
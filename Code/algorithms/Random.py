@@ -1,19 +1,156 @@
 import random
+import numpy as np
 from Code.visual.visualizer import *
 from ..classes.RushClass import RushHour
-from typing import Union, Dict, List, Optional
+from ..classes.TopologyClass import BoardTopology
+from ..classes.BatchEngineClass import BatchEngine
+from typing import Union, Dict, List, Optional, Tuple
 
+# number of walks below which random_rollouts finishes them one by one
+HANDOFF_WALKS = 16
 
-def random_solve_puzzle(Rush_game: RushHour, max_iterations: int=1000000)\
+
+def legal_moves(topology: BoardTopology, positions: List[int], occupied: int,\
+                                slide: bool =False) -> List[Tuple[int, int, int]]:
+    """
+    Lists the moves of a compact state, in the same order as the moves and
+    slide_moves of the states, without creating the next states.
+
+    Args:
+    ---------------------------------------------------------------------------
+        topology (BoardTopology): The board.
+        positions (List[int]): Free coordinate of every vehicle.
+        occupied (int): Bitboard of the occupied cells.
+        slide (bool): List multi-cell slides instead of single steps.
+
+    Returns:
+    ---------------------------------------------------------------------------
+        List[Tuple[int, int, int]]: The index of the moved vehicle, its new
+        position and the bits of the cells it leaves and enters.
+    """
+    moves = []
+    if slide:
+        for i, position in enumerate(positions):
+            for direction in topology.bit_slide_table[i][position]:
+                for new_position, free_bit, toggle in direction:
+                    # the vehicle can not slide past an occupied cell
+                    if occupied & free_bit:
+                        break
+                    moves.append((i, new_position, toggle))
+    else:
+        for i, position in enumerate(positions):
+            for new_position, free_bit, toggle in topology.bit_move_table[i][position]:
+                if not occupied & free_bit:
+                    moves.append((i, new_position, toggle))
+    return moves
+
+
+def path_moves(path: List[RushHour]) -> List[Tuple[int, int]]:
+    """
+    Gets the moves of a path of states.
+
+    Args:
+    ---------------------------------------------------------------------------
+        path (List[RushHour]): The states of the path.
+
+    Returns:
+    ---------------------------------------------------------------------------
+        List[Tuple[int, int]]: The index and new position of the vehicle
+        moved at every step.
+    """
+    moves = []
+    for state, next_state in zip(path, path[1:]):
+        for index, (p, next_p) in enumerate(zip(state.positions, next_state.positions)):
+            if p != next_p:
+                moves.append((index, next_p))
+                break
+    return moves
+
+
+def replay_moves(Rush_game: RushHour, moves: List[Tuple[int, int]]) -> List[RushHour]:
+    """
+    Builds the states of a walk from its moves.
+
+    Args:
+    ---------------------------------------------------------------------------
+        Rush_game (RushHour): The start state of the walk.
+        moves (List[Tuple[int, int]]): The index and new position of the
+            vehicle moved at every step.
+
+    Returns:
+    ---------------------------------------------------------------------------
+        List[RushHour]: The states of the walk, from the start state.
+    """
+    path = [Rush_game]
+    positions = list(Rush_game.positions)
+    for index, position in moves:
+        positions[index] = position
+        path.append(Rush_game.at_positions(tuple(positions)))
+    return path
+
+
+def random_walk(topology: BoardTopology, positions: List[int], slide: bool,\
+                rng: random.Random, max_iterations: int) -> Optional[List[Tuple[int, int]]]:
+    """
+    Walks randomly from a state on its positions and the occupancy bitboard
+    of its vehicles, recording only the moves. With the same generator it
+    makes the same moves as picking a random state from the moves of every
+    state.
+
+    Args:
+    ---------------------------------------------------------------------------
+        topology (BoardTopology): The board.
+        positions (List[int]): Free coordinate of every vehicle, updated
+            along the walk.
+        slide (bool): Pick random multi-cell slides instead of single steps.
+        rng (random.Random): The generator of the moves.
+        max_iterations (int): Maximum number of iterations of the walk.
+
+    Returns:
+    ---------------------------------------------------------------------------
+        Optional[List[Tuple[int, int]]]: The index and new position of the
+        vehicle moved at every step until the puzzle is solved, or None if
+        it is not solved within the maximum iterations.
+    """
+    occupied = topology.wall_bits
+    for masks, position in zip(topology.masks, positions):
+        occupied |= masks[position]
+    red = topology.red_index
+    exit_position = topology.dim_board - topology.lengths[red]
+    moves = []
+
+    for _ in range(max_iterations):
+        if positions[red] == exit_position:
+            return moves
+
+        possible_moves = legal_moves(topology, positions, occupied, slide)
+        # break if no more possible moves
+        if not possible_moves:
+            break
+        # choose a random move and only apply it to the compact state
+        i, new_position, toggle = rng.choice(possible_moves)
+        positions[i] = new_position
+        occupied ^= toggle
+        moves.append((i, new_position))
+
+    return None
+
+
+def random_solve_puzzle(Rush_game: RushHour, max_iterations: int=1000000,\
+                                slide: bool =False, seed: Optional[int] =None)\
     -> Optional[Dict[str, Union[int, List[RushHour], Dict[int, List[RushHour]]]]]:
     """
-    Attempt to solve the Rush Hour puzzle using a random approach.
+    Attempt to solve the Rush Hour puzzle using a random approach. The walk
+    only records its moves, the states of the solution path are built once
+    the puzzle is solved.
 
     Args:
     ---------------------------------------------------------------------------
         Rush_game (RushGame): An instance of the Rush Hour puzzle game.
         max_iterations (int): Maximum number of iterations to attempt for 
         finding a solution.
+        slide (bool): Pick random multi-cell slides instead of single steps.
+        seed (Optional[int]): Seed of the random moves, a random seed if None.
 
     Returns:
     ---------------------------------------------------------------------------
@@ -22,20 +159,151 @@ def random_solve_puzzle(Rush_game: RushHour, max_iterations: int=1000000)\
         solved, otherwise None if no solution is found within the maximum iterations.
     """
     
-    game = Rush_game
-    solution_path = [game]
+    # every solve has its own generator, so parallel solves do not share state
+    rng = random.Random(seed)
+    moves = random_walk(Rush_game.topology, list(Rush_game.positions), slide,\
+                                                        rng, max_iterations)
+    if moves is None:
+        return None
+    solution_path = replay_moves(Rush_game, moves)
+    return {'game': solution_path[-1], 'solution': solution_path, 'visited': len(moves)}
 
-    for _ in range(max_iterations):
-        if game.is_solved():
-            return {'game': game, 'solution': solution_path, 'visited': _}
 
-        possible_moves = list(game.moves())
-        # break if no more possible moves
-        if not possible_moves:
+def random_rollouts(Rush_game: RushHour, walks: int, max_iterations: int =1000000,\
+                                slide: bool =False, seed: Optional[int] =None)\
+                                -> Dict[str, Union[np.ndarray, List[RushHour], int]]:
+    """
+    Runs many independent random walks in lockstep on NumPy arrays, with a
+    row of vehicle positions per walk. At every step the legal moves of all
+    walks are found at once and every walk picks one of its own moves
+    uniformly at random, so the walks follow the same distribution as
+    random_solve_puzzle. Solved walks leave the arrays, and only the moves of
+    the last walk are recorded, to build its solution path.
+
+    Args:
+    ---------------------------------------------------------------------------
+        Rush_game (RushHour): The start state of every walk.
+        walks (int): Number of walks.
+        max_iterations (int): Maximum number of steps of a walk.
+        slide (bool): Pick random multi-cell slides instead of single steps.
+        seed (Optional[int]): Seed of the random moves, a random seed if None.
+
+    Returns:
+    ---------------------------------------------------------------------------
+        Dict[str, Union[np.ndarray, List[RushHour], int]]: The number of
+        states on the path of every walk and its number of moves, both 0 for
+        a walk that was not solved, and the solution path and the number of
+        steps of the last walk, None and 0 if it was not solved.
+    """
+    topology = Rush_game.topology
+    engine = BatchEngine(topology)
+    dimension = topology.dim_board
+    red = topology.red_index
+    exit_position = dimension - topology.lengths[red]
+    rng = np.random.default_rng(seed)
+
+    # the lanes padded with the always occupied cell, so every column a
+    # move looks at is on the lane table
+    lanes = np.pad(engine.lane_cells, ((0, 0), (dimension, dimension)),\
+                   constant_values=engine.off_board)
+    lane_width = lanes.shape[1]
+    lanes = lanes.ravel()
+    cells = engine.off_board + 1
+    # the cells of every vehicle, as indices into the lane table
+    cell_vehicle = np.array([i for i, length in enumerate(topology.lengths)\
+                             for _ in range(length)], dtype=np.intp)
+    cell_base = cell_vehicle * lane_width + dimension + 1 +\
+        np.array([j for length in topology.lengths for j in range(length)], dtype=np.intp)
+    # every candidate move, by distance and then per vehicle backward and
+    # forward, with the cell that has to be free for it, the walks pick
+    # uniformly among their legal moves so the order does not matter
+    distances = dimension - 1 if slide else 1
+    vehicle, delta, offset = [], [], []
+    for distance in range(1, distances + 1):
+        for i, length in enumerate(topology.lengths):
+            for direction in (-1, 1):
+                vehicle.append(i)
+                delta.append(direction * distance)
+                offset.append(1 - distance if direction < 0 else length + distance)
+    vehicle = np.array(vehicle, dtype=np.intp)
+    delta = np.array(delta, dtype=np.intp)
+    move_base = vehicle * lane_width + dimension + np.array(offset, dtype=np.intp)
+    width = 2 * len(topology.lengths)
+
+    positions = np.tile(np.array(Rush_game.positions, dtype=np.intp), (walks, 1))
+    walk_ids = np.arange(walks)
+    last_vehicle = np.full(walks, -1, dtype=np.intp)
+    move_counts = np.zeros(walks, dtype=np.int64)
+    steps = np.zeros(walks, dtype=np.int64)
+    moves = np.zeros(walks, dtype=np.int64)
+    # row of the recorded walk, None once it left the arrays
+    kept = walks - 1
+    kept_row = kept
+    kept_moves = []
+
+    for iteration in range(max_iterations):
+        solved = positions[:, red] == exit_position
+        steps[walk_ids[solved]] = iteration + 1
+        moves[walk_ids[solved]] = move_counts[solved]
+
+        # the occupancy of all walks as one flat array, a row per walk
+        row_base = (np.arange(len(positions)) * cells)[:, None]
+        occupied = np.zeros(len(positions) * cells, dtype=bool)
+        occupied[engine.off_board::cells] = True
+        for x, y in topology.walls:
+            occupied[y * dimension + x::cells] = True
+        occupied[row_base + lanes[positions[:, cell_vehicle] + cell_base]] = True
+        legal = ~occupied[row_base + lanes[positions[:, vehicle] + move_base]]
+        # a slide needs every cell up to its distance to be free
+        for d in range(1, distances):
+            legal[:, d * width:(d + 1) * width] &= legal[:, (d - 1) * width:d * width]
+        counts = np.count_nonzero(legal, axis=1)
+
+        # drop the solved walks and the ones without moves
+        active = ~solved & (counts > 0)
+        if not active.all():
+            if kept_row is not None:
+                kept_row = int(np.count_nonzero(active[:kept_row]))\
+                                                if active[kept_row] else None
+            positions, walk_ids, last_vehicle, move_counts, legal, counts =\
+                positions[active], walk_ids[active], last_vehicle[active],\
+                move_counts[active], legal[active], counts[active]
+            if not len(positions):
+                break
+
+        # the last walks are finished one by one, as a step of a few rows
+        # costs more on the arrays than on the compact state
+        if len(positions) <= HANDOFF_WALKS:
+            walk_rng = random.Random(int(rng.integers(2 ** 63)))
+            for row, walk in enumerate(walk_ids):
+                tail = random_walk(topology, positions[row].tolist(), slide,\
+                                   walk_rng, max_iterations - iteration)
+                if tail is None:
+                    continue
+                count, previous = int(move_counts[row]), int(last_vehicle[row])
+                for i, _ in tail:
+                    count += i != previous
+                    previous = i
+                steps[walk] = iteration + len(tail) + 1
+                moves[walk] = count
+                if row == kept_row:
+                    kept_moves.extend(tail)
             break
-        # choose a random new state from the list to make move
-        game = random.choice(possible_moves)
-        solution_path.append(game)
 
-    return None
+        # the chosen move is the first one with as many legal moves before it
+        choice = np.minimum((rng.random(len(positions)) * counts).astype(np.int64),\
+                            counts - 1)
+        index = np.argmax(legal.cumsum(axis=1, dtype=np.int16) > choice[:, None],\
+                          axis=1)
+        rows = np.arange(len(positions))
+        moved = vehicle[index]
+        positions[rows, moved] += delta[index]
+        # consecutive steps of the same vehicle form a single move
+        move_counts += moved != last_vehicle
+        last_vehicle = moved
+        if kept_row is not None:
+            kept_moves.append((int(moved[kept_row]), int(positions[kept_row, moved[kept_row]])))
 
+    solution = replay_moves(Rush_game, kept_moves) if steps[kept] else None
+    return {'steps': steps, 'moves': moves, 'solution': solution,\
+            'visited': max(0, int(steps[kept]) - 1)}
@@ -1,14 +1,42 @@
 import time
 import csv
+import json
+import random
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from tqdm import tqdm
 from Code.algorithms.IDDFS import iterative_deepening_search
 from Code.classes.VehicleClass import Vehicle
 from Code.classes.RushClass import RushHour
-from Code.algorithms.Random import random_solve_puzzle
-from Code.algorithms.BFS import breadth_first_search
+from Code.classes.BitboardClass import BitboardRushHour
+from Code.classes.LineIndexClass import LineIndex
+from Code.classes.SolutionCacheClass import SolutionCache
+from Code.algorithms.Random import random_solve_puzzle, random_rollouts,\
+                                   replay_moves, path_moves
+from Code.algorithms.BFS import breadth_first_search, bidirectional_search,\
+                    external_breadth_first_search, batch_breadth_first_search
+from Code.algorithms.ParallelBFS import parallel_breadth_first_search
+from Code.algorithms.ClusterSearch import cluster_search
+from Code.algorithms.PathShortening import erase_loops, shorten_path
 from Code.algorithms.Astar import Astar
+from Code.algorithms.IDAstar import IDAstar
+from Code.algorithms.MCTS import MCTS
+from Code.algorithms.BeamSearch import BeamSearch
+from Code.visual.results import desc_layers, desc_verification
 from argparse import Namespace
-from typing import List
+from typing import List, Optional, Tuple, Dict, Iterable, Iterator, Union
+
+# a game of a batch, with the algorithm, the keyword arguments of solve_game,
+# whether to return the solution and to detach it from its parents, and the
+# database entry of the game if the solution is verified
+Task = Tuple[RushHour, str, Dict[str, any], bool, bool, Optional[Dict[str, any]]]
+
+# maximum number of random walks of a game run in lockstep at once on the
+# numpy engine, the batches are spread over the workers
+ROLLOUT_BATCH = 1000
+
+# algorithms whose solutions are optimal in moves when searching with slides
+EXACT_ALGORITHMS = ('bfs', 'bibfs', 'parbfs', 'iddfs', 'cluster')
 
 def load_game_data(args: Namespace):
     """
@@ -22,6 +50,7 @@ def load_game_data(args: Namespace):
     Returns:
     ---------------------------------------------------------------------------
         A generator yielding RushHour game instances, or None if loading fails.
+        With args.verify every game is paired with its database entry.
     """
     
     file_type = args.file_type.lower()
@@ -32,6 +61,10 @@ def load_game_data(args: Namespace):
             print("Please specify both dimension and board number for CSV files.")
             return None
         file_path = f'boards/Rushhour{args.dimension}x{args.dimension}_{args.board_number}.csv'
+        if args.verify:
+            # the csv boards have no known optimum, only the replay is checked
+            return ((game, {"board": file_path, "optimal_moves": None})
+                    for game in load_csv_file(file_path, args.dimension))
         return load_csv_file(file_path, args.dimension)
         
     elif file_type == 'txt':
@@ -42,10 +75,15 @@ def load_game_data(args: Namespace):
 
         file_path = 'boards/Board_file.txt'
         try:
-            with open(file_path, 'r') as file:
-                total_games = sum(1 for _ in file)
+            # the line index is built once, later runs only read its size
+            index = LineIndex(file_path)
+            total_games = len(index)
+            index.close()
             game_indices = get_game_indices(args, total_games)
-            return load_txt_file(file_path, game_indices)
+            return load_txt_file(file_path, game_indices, min_moves=args.min_moves,\
+                                 max_moves=args.max_moves, min_cluster=args.min_cluster,\
+                                 max_cluster=args.max_cluster, sample=args.sample,\
+                                 seed=args.seed, with_entries=args.verify)
         except FileNotFoundError:
             print(f"Error: The file {file_path} was not found.")
             return None
@@ -76,50 +114,183 @@ def load_csv_file(rushhour_file: str, dimension: int) -> RushHour:
     yield RushHour(set(vehicles), dimension)
 
 
-def load_txt_file(file_path: str, game_indices: int, dimension: int =6) -> RushHour:
+def load_txt_file(file_path: str, game_indices: Iterable[int], dimension: int =6,\
+                  min_moves: Optional[int] =None, max_moves: Optional[int] =None,\
+                  min_cluster: Optional[int] =None, max_cluster: Optional[int] =None,\
+                  sample: Optional[int] =None, seed: Optional[int] =None,\
+                  with_entries: bool =False) -> Union[RushHour, Tuple[RushHour, Dict[str, any]]]:
     """
-    Loads Rush Hour games from a text file.
+    Loads Rush Hour games from a text file. The lines are read one at a time,
+    jumping to a game through the line index of the file, and are filtered on
+    their optimal number of moves and cluster size before a game is created.
     
     Args:
     ---------------------------------------------------------------------------
         file_path (str): Path to the text file.
-        game_indices (List[int]): List of game indices to load.
+        game_indices (Iterable[int]): Game indices to load.
         dimension (int): The dimension of the game board, default is 6.
+        min_moves (Optional[int]): Minimum optimal number of moves.
+        max_moves (Optional[int]): Maximum optimal number of moves.
+        min_cluster (Optional[int]): Minimum number of configurations in the
+            cluster of the game.
+        max_cluster (Optional[int]): Maximum number of configurations in the
+            cluster of the game.
+        sample (Optional[int]): Number of games to pick at random from the
+            games that pass the filters, all games if None.
+        seed (Optional[int]): Seed of the sample.
+        with_entries (bool): Pair every game with its database entry, the
+            board and the optimal number of moves, to verify the solutions.
         
     Returns:
     ---------------------------------------------------------------------------
         Generator[RushHour, None, None]: A generator yielding RushHour game 
-        instances.
+        instances, or tuples of a game and its entry.
     """
     
-    with open(file_path, 'r') as file:
-        lines = file.readlines()
+    lines = read_txt_lines(file_path, game_indices)
+    if any(bound is not None for bound in (min_moves, max_moves, min_cluster, max_cluster)):
+        lines = (game_data for game_data in lines if line_matches(game_data,\
+                    min_moves, max_moves, min_cluster, max_cluster))
+    if sample is not None:
+        lines = sample_lines(lines, sample, seed)
+    for game_data in lines:
+        if with_entries:
+            moves, board_config, num_configs = game_data.split()
+            yield parse_txt_line(game_data, dimension),\
+                {"board": board_config, "optimal_moves": int(moves)}
+        else:
+            yield parse_txt_line(game_data, dimension)
 
-    for i in game_indices:
-        if i < len(lines):
-            game_data = lines[i].strip()
-            steps, board_config, num_configs = game_data.split()
-            vehicle_positions = {}
 
-            for j, char in enumerate(board_config):
-                if char not in ['o', 'x']:
-                    if char not in vehicle_positions:
-                        vehicle_positions[char] = [j]
-                    else:
-                        vehicle_positions[char].append(j)
+def read_txt_lines(file_path: str, game_indices: Iterable[int]) -> Iterator[str]:
+    """
+    Reads lines of a text file one at a time, only seeking through the line
+    index when a line does not follow the previous one.
+    
+    Args:
+    ---------------------------------------------------------------------------
+        file_path (str): Path to the text file.
+        game_indices (Iterable[int]): Line numbers to read.
+        
+    Returns:
+    ---------------------------------------------------------------------------
+        Iterator[str]: The lines, in the order of the line numbers.
+    """
+    index = LineIndex(file_path)
+    try:
+        with open(file_path, 'rb') as file:
+            next_line = None
+            for i in game_indices:
+                if 0 <= i < len(index):
+                    # only seek when the game does not follow the previous one
+                    if i != next_line:
+                        file.seek(index.offset(i))
+                    game_data = file.readline().decode()
+                    next_line = i + 1
+                    yield game_data
+    finally:
+        index.close()
 
-            vehicles = []
-            for vehicle_id, positions in vehicle_positions.items():
-                x, y = positions[0] % dimension, positions[0] // dimension
-                length = len(positions)
-                orientation = 'H' if positions[1] % dimension > positions[0] % dimension else 'V'
 
-                vehicles.append(Vehicle(vehicle_id, orientation, x, y, length))
+def line_matches(game_data: str, min_moves: Optional[int] =None,\
+                 max_moves: Optional[int] =None, min_cluster: Optional[int] =None,\
+                 max_cluster: Optional[int] =None) -> bool:
+    """
+    Checks the optimal number of moves and the cluster size of a line against
+    the bounds, without parsing the board.
+    
+    Args:
+    ---------------------------------------------------------------------------
+        game_data (str): The line of the game.
+        min_moves (Optional[int]): Minimum optimal number of moves.
+        max_moves (Optional[int]): Maximum optimal number of moves.
+        min_cluster (Optional[int]): Minimum cluster size.
+        max_cluster (Optional[int]): Maximum cluster size.
+        
+    Returns:
+    ---------------------------------------------------------------------------
+        bool: True if the game is within all given bounds.
+    """
+    moves, board_config, num_configs = game_data.split()
+    moves, num_configs = int(moves), int(num_configs)
+    return (min_moves is None or moves >= min_moves) and\
+        (max_moves is None or moves <= max_moves) and\
+        (min_cluster is None or num_configs >= min_cluster) and\
+        (max_cluster is None or num_configs <= max_cluster)
 
-            yield RushHour(set(vehicles), dimension)
 
+def sample_lines(lines: Iterable[str], size: int, seed: Optional[int] =None) -> List[str]:
+    """
+    Picks a uniform random sample of lines in a single pass, with reservoir
+    sampling, so only the sample is kept in memory.
+    
+    Args:
+    ---------------------------------------------------------------------------
+        lines (Iterable[str]): The lines to sample from.
+        size (int): Number of lines in the sample.
+        seed (Optional[int]): Seed of the sample, a random seed if None.
+        
+    Returns:
+    ---------------------------------------------------------------------------
+        List[str]: The sampled lines, in their order in the file.
+    """
+    rng = random.Random(seed)
+    reservoir = []
+    for number, line in enumerate(lines):
+        if number < size:
+            reservoir.append((number, line))
+        else:
+            # keep the line with probability size / (number + 1)
+            slot = rng.randrange(number + 1)
+            if slot < size:
+                reservoir[slot] = (number, line)
+    return [line for _, line in sorted(reservoir)]
 
-def get_game_indices(args, total_games: int) -> List[str]:
+
+def parse_txt_line(game_data: str, dimension: int =6) -> RushHour:
+    """
+    Parses a line of the text file into a Rush Hour game. A line holds the
+    optimal number of moves, the board and the number of configurations in
+    its cluster. The database names the red car 'A', so on boards without an
+    'X' the 'A' is taken as the red car. The walls of the board, 'x', are
+    fixed cells no vehicle can move into.
+    
+    Args:
+    ---------------------------------------------------------------------------
+        game_data (str): The line of the game.
+        dimension (int): The dimension of the game board, default is 6.
+        
+    Returns:
+    ---------------------------------------------------------------------------
+        RushHour: The game on the line.
+    """
+    steps, board_config, num_configs = game_data.split()
+    if 'X' not in board_config:
+        board_config = board_config.replace('A', 'X')
+    vehicle_positions = {}
+    walls = []
+
+    for j, char in enumerate(board_config):
+        if char == 'x':
+            walls.append((j % dimension, j // dimension))
+        elif char != 'o':
+            if char not in vehicle_positions:
+                vehicle_positions[char] = [j]
+            else:
+                vehicle_positions[char].append(j)
+
+    vehicles = []
+    for vehicle_id, positions in vehicle_positions.items():
+        x, y = positions[0] % dimension, positions[0] // dimension
+        length = len(positions)
+        orientation = 'H' if positions[1] % dimension > positions[0] % dimension else 'V'
+
+        vehicles.append(Vehicle(vehicle_id, orientation, x, y, length))
+
+    return RushHour(set(vehicles), dimension, walls=walls)
+
+
+def get_game_indices(args, total_games: int) -> Iterable[int]:
     """
     Determines game indices to load based on user arguments.
     
@@ -130,22 +301,140 @@ def get_game_indices(args, total_games: int) -> List[str]:
         
     Returns:
     ---------------------------------------------------------------------------
-        List[int]: List of game indices to be loaded.
+        Iterable[int]: The game indices to be loaded, in order.
     """
     
     if args.all_games:
-        return list(range(total_games))
+        return range(total_games)
     elif args.single_game is not None:
         return [args.single_game]
     elif args.game_range is not None:
         start, end = map(int, args.game_range.split('-'))
-        return list(range(start, end + 1))
+        return range(start, end + 1)
+
+
+def count_moves(solution: List[RushHour]) -> int:
+    """
+    Counts the moves of a solution path, where consecutive steps of the same
+    vehicle form a single move, as in the puzzle database.
+
+    Args:
+    ---------------------------------------------------------------------------
+        solution (List[RushHour]): The states of the solution path.
+
+    Returns:
+    ---------------------------------------------------------------------------
+        int: The number of moves in the solution.
+    """
+    moves = 0
+    previous_vehicle = None
+    for state, next_state in zip(solution, solution[1:]):
+        # the positions are in the order of the sorted vehicle ids, so find
+        # the one that differs
+        moved_vehicle = next(i for i, (p, next_p) in enumerate(
+                        zip(state.positions, next_state.positions)) if p != next_p)
+        if moved_vehicle != previous_vehicle:
+            moves += 1
+        previous_vehicle = moved_vehicle
+    return moves
+
+
+def replay_solution(rush_game: RushHour, solution: List[RushHour],\
+                                        slide: bool =False) -> Optional[str]:
+    """
+    Replays a solution from the game, checking that it starts at the game,
+    that every transition is a legal move and that it ends solved.
+
+    Args:
+    ---------------------------------------------------------------------------
+        rush_game (RushHour): The solved game.
+        solution (List[RushHour]): The states of the solution path.
+        slide (bool): Allow multi-cell slides instead of single steps.
+
+    Returns:
+    ---------------------------------------------------------------------------
+        Optional[str]: The first problem found, None if the solution is legal.
+    """
+    if solution[0].positions != rush_game.positions:
+        return "the solution does not start at the game"
+    for step, (state, next_state) in enumerate(zip(solution, solution[1:]), 1):
+        next_states = state.slide_moves() if slide else state.moves()
+        if not any(move.positions == next_state.positions for move in next_states):
+            return f"step {step} is not a legal move"
+    if not solution[-1].is_solved():
+        return "the solution does not end in a solved state"
+    return None
+
+
+def verify_solution(rush_game: RushHour, solution: Optional[List[RushHour]],\
+                    algorithm: str, options: Dict[str, any],\
+                    entry: Dict[str, any]) -> Dict[str, any]:
+    """
+    Verifies a solution against the database entry of its game. The
+    solution is replayed, and its number of moves is compared to the optimal
+    number of moves of the database. A solution shorter than the optimum is
+    always a mismatch, a longer one only for algorithms that are optimal in
+    moves, which are the exact algorithms searching with slides.
+
+    Args:
+    ---------------------------------------------------------------------------
+        rush_game (RushHour): The solved game.
+        solution (Optional[List[RushHour]]): The solution of solve_game.
+        algorithm (str): The algorithm that solved the game.
+        options (Dict[str, any]): Keyword arguments of solve_game.
+        entry (Dict[str, any]): The database entry of the game, with the
+            optimal number of moves if known.
+
+    Returns:
+    ---------------------------------------------------------------------------
+        Dict[str, any]: The entry with the steps, the moves, the gap to the
+        optimal number of moves and the problems found.
+    """
+    slide = options.get('slide', False)
+    exact = algorithm.lower() in EXACT_ALGORITHMS or (algorithm.lower() in\
+                ('astar', 'idastar') and options.get('astar_mode') == 'optimal')
+    optimal_moves = entry.get('optimal_moves')
+    record = dict(entry, algorithm=algorithm, solved=bool(solution),\
+                  steps=None, moves=None, gap=None, problems=[])
+
+    if not solution:
+        if exact:
+            record['problems'].append("unsolved")
+        return record
+
+    error = replay_solution(rush_game, solution, slide)
+    record['steps'] = len(solution)
+    if error is not None:
+        record['problems'].append(error)
+        return record
+
+    moves = count_moves(solution)
+    record['moves'] = moves
+    if optimal_moves is not None:
+        record['gap'] = moves - optimal_moves
+        if moves < optimal_moves:
+            record['problems'].append(f"{moves} moves is below the optimal {optimal_moves}")
+        elif moves > optimal_moves and exact and slide:
+            record['problems'].append(f"{moves} moves is above the optimal {optimal_moves}")
+    return record
 
 
 def solve_game(rush_game: RushHour, algorithm: str, max_depth: int =1000,\
-                    max_iterations: int =1000000):
+                    max_iterations: int =1000000, engine: str ='object',\
+                    slide: bool =False, astar_mode: str ='fast', weight: float =1.0,\
+                    seed: Optional[int] =None, workers: int =1,\
+                    cache: Optional[str] =None, memory_limit: Optional[int] =None,\
+                    postprocess: str ='none', shorten_depth: int =8,\
+                    mcts_iterations: Optional[int] =None,\
+                    time_limit: Optional[float] =None, mcts_evaluate: bool =False,\
+                    beam_width: int =100, beam_restarts: int =0,\
+                    cluster_dir: Optional[str] =None):
     """
-    Solves a Rush Hour game using a specified algorithm.
+    Solves a Rush Hour game using a specified algorithm. With a cache the
+    solution of an earlier solve of the same board and settings is returned
+    without searching, and new solutions are added to it. The solution can
+    be post-processed, removing its cycles and shortening it by local
+    searches, the cache keeps the solution of the search.
     
     Args:
     ---------------------------------------------------------------------------
@@ -153,69 +442,599 @@ def solve_game(rush_game: RushHour, algorithm: str, max_depth: int =1000,\
         algorithm (str): The name of the algorithm to use for solving.
         max_depth (int): Maximum depth for depth-related algorithms.
         max_iterations (int): Maximum iterations for iteration-based algorithms.
+        engine (str): State representation to search with, 'object' for
+            RushHour, 'bitboard' for BitboardRushHour or 'numpy' for the
+            BatchEngine, which expands whole depth levels of BFS at once, or
+            for the random walks in lockstep of Random.
+        slide (bool): Search with multi-cell slides instead of single steps.
+        astar_mode (str): Heuristic mode of Astar and IDAstar, 'fast',
+            'weighted' or 'optimal'.
+        weight (float): Weight of the heuristic in the 'weighted' mode.
+        seed (Optional[int]): Seed of the Random and MCTS algorithms.
+        workers (int): Number of processes of the ParBFS algorithm.
+        cache (Optional[str]): Path of the solution cache, None to always
+            search.
+        memory_limit (Optional[int]): Maximum number of visited states BFS
+            keeps in memory before spilling them to disk, None for no limit.
+        postprocess (str): Post-processing of the solution, 'none', 'erase'
+            to remove its cycles, or 'shorten' to also shorten it by local
+            searches.
+        shorten_depth (int): Maximum number of steps of a shortcut found by
+            the local searches.
+        mcts_iterations (Optional[int]): Maximum number of simulations of
+            MCTS, None for the default of MCTS or only the time limit.
+        time_limit (Optional[float]): Maximum wall-clock time of MCTS in
+            seconds, None for no limit.
+        mcts_evaluate (bool): Score the rollouts of MCTS that do not solve
+            the puzzle with the heuristic of Astar.
+        beam_width (int): Number of states Beam keeps per depth.
+        beam_restarts (int): Maximum number of times Beam starts over with a
+            beam twice as wide when it finds no solution.
+        cluster_dir (Optional[str]): Directory of the distance tables of the
+            Cluster algorithm, None to build a table for every solve without
+            keeping it.
         
     Returns:
     ---------------------------------------------------------------------------
         Tuple[Optional[Dict[str, any]], int]: Tuple containing the solution 
-        details and status code.
+        details and status code. A post-processed solution adds the steps
+        and moves of the solution of the search as raw_steps and raw_moves,
+        and ParBFS adds the depth_states and layer_times of its layers. A
+        BiBFS solve that fell back to breadth-first search adds fallback.
     """
     
     start_time = time.perf_counter()
     results = None
 
+    if engine.lower() not in ('object', 'bitboard', 'numpy'):
+        print("Invalid engine. Please choose from object, bitboard or numpy.")
+        return None, {"steps": 0, "moves": 0, "visited": 0, "time": 0}, 1
+
+    if engine.lower() == 'numpy' and algorithm.lower() not in ('bfs', 'random'):
+        print("The numpy engine only runs BFS and Random, please choose object or bitboard.")
+        return None, {"steps": 0, "moves": 0, "visited": 0, "time": 0}, 1
+
+    if algorithm.lower() in ('astar', 'idastar') and astar_mode not in ('fast', 'weighted', 'optimal'):
+        print("Invalid Astar mode. Please choose from fast, weighted or optimal.")
+        return None, {"steps": 0, "moves": 0, "visited": 0, "time": 0}, 1
+
+    if postprocess not in ('none', 'erase', 'shorten'):
+        print("Invalid post-processing. Please choose from none, erase or shorten.")
+        return None, {"steps": 0, "moves": 0, "visited": 0, "time": 0}, 1
+
+    # the engines find solutions of the same length, so they share the
+    # cached ones, an unseeded Random solve is never the same and is not
+    # cached, nor one on the numpy engine, whose walk differs for a seed,
+    # and neither is an unseeded MCTS solve or one stopped by the clock
+    if algorithm.lower() == 'random' and (seed is None or engine.lower() == 'numpy'):
+        cache = None
+    if algorithm.lower() == 'mcts' and (seed is None or time_limit is not None):
+        cache = None
+    start_game = rush_game
+    if cache is not None:
+        cache = SolutionCache.shared(cache)
+        settings = {"max_depth": max_depth, "max_iterations": max_iterations,\
+                    "slide": slide, "astar_mode": astar_mode, "weight": weight,\
+                    "seed": seed}
+        if algorithm.lower() == 'mcts':
+            settings.update(mcts_iterations=mcts_iterations, mcts_evaluate=mcts_evaluate)
+        if algorithm.lower() == 'beam':
+            settings.update(beam_width=beam_width, beam_restarts=beam_restarts)
+        cached = cache.get(start_game, algorithm, settings)
+        if cached is not None:
+            solution, moves, visited = cached
+            result = {"steps": len(solution), "moves": moves, "visited": visited,\
+                      "time": time.perf_counter() - start_time}
+            return postprocess_solution(solution, result, postprocess, slide,\
+                                        shorten_depth, start_time) + (0,)
+
+    if engine.lower() == 'bitboard':
+        rush_game = BitboardRushHour.from_rush_hour(rush_game)
+
     if algorithm.lower() == 'astar':
-        results = Astar(rush_game).astar_search(rush_game)
+        results = Astar(rush_game).astar_search(rush_game, slide=slide,\
+                                                mode=astar_mode, weight=weight)
+    elif algorithm.lower() == 'idastar':
+        results = IDAstar(rush_game).ida_star_search(rush_game, slide=slide,\
+                                                mode=astar_mode, weight=weight)
     elif algorithm.lower() == 'iddfs':
-        results = iterative_deepening_search(rush_game, max_depth)
+        results = iterative_deepening_search(rush_game, max_depth, slide)
+    elif algorithm.lower() == 'bfs' and engine.lower() == 'numpy':
+        results = batch_breadth_first_search(rush_game, max_depth, slide)
+    elif algorithm.lower() == 'bfs' and memory_limit is not None:
+        results = external_breadth_first_search(rush_game, max_depth, slide,\
+                                                memory_limit)
     elif algorithm.lower() == 'bfs':
-        results = breadth_first_search(rush_game, max_depth)
+        results = breadth_first_search(rush_game, max_depth, slide)
+    elif algorithm.lower() == 'parbfs':
+        results = parallel_breadth_first_search(rush_game, max_depth, slide, workers)
+    elif algorithm.lower() == 'bibfs':
+        results = bidirectional_search(rush_game, max_depth, slide)
+    elif algorithm.lower() == 'cluster':
+        results = cluster_search(rush_game, cluster_dir, slide)
+    elif algorithm.lower() == 'random' and engine.lower() == 'numpy':
+        results = random_rollouts(rush_game, 1, max_iterations, slide, seed)
     elif algorithm.lower() == 'random':
-        results = random_solve_puzzle(rush_game, max_iterations)
+        results = random_solve_puzzle(rush_game, max_iterations, slide, seed)
+    elif algorithm.lower() == 'mcts':
+        results = MCTS(rush_game).mcts_search(rush_game, mcts_iterations, time_limit,\
+                                            slide, evaluate=mcts_evaluate, seed=seed)
+    elif algorithm.lower() == 'beam':
+        results = BeamSearch(rush_game).beam_search(rush_game, beam_width, max_depth,\
+                                                    slide, beam_restarts)
     else:
-        print("Invalid algorithm. Please choose from Astar, IDDFS, DFS, Random or BFS.")
-        return None, 1
+        print("Invalid algorithm. Please choose from Astar, IDAstar, IDDFS, DFS, Random, BFS, BiBFS, ParBFS, Cluster, MCTS or Beam.")
+        return None, {"steps": 0, "moves": 0, "visited": 0, "time": 0}, 1
 
     end_time = time.perf_counter()
     if results and (results.get('solution')):
         solution = results.get('solution')
         visited = results.get('visited')
         steps = len(solution)
-        return solution, {"steps": steps, "visited": visited, "time": end_time - start_time}, 0
+        # hand the object model to the visualizer by replaying the moves on
+        # the start state
+        if isinstance(rush_game, BitboardRushHour):
+            solution = replay_moves(start_game, path_moves(solution))
+        moves = count_moves(solution)
+        result = {"steps": steps, "moves": moves, "visited": visited,\
+                                        "time": end_time - start_time}
+        # the layers of a level-synchronous search, printed by the batch
+        if 'layer_times' in results:
+            result.update(depth_states=results['depth_states'],\
+                          layer_times=results['layer_times'])
+        # BiBFS without a goal set searched with BFS instead
+        if results.get('fallback'):
+            result['fallback'] = True
+        if cache is not None:
+            cache.put(start_game, algorithm, settings, solution, result)
+        return postprocess_solution(solution, result, postprocess, slide,\
+                                    shorten_depth, start_time) + (0,)
     else:
-        return {"steps": 0, "time": 0}, 1
+        return None, {"steps": 0, "moves": 0, "visited": 0, "time": 0}, 1
 
 
-def solve_rush_hour_games(rush_games: List[RushHour], algorithm: str, repeat: int):
+def postprocess_solution(solution: List[RushHour], result: Dict[str, float],\
+                         postprocess: str, slide: bool, shorten_depth: int,\
+                         start_time: float) -> Tuple[List[RushHour], Dict[str, float]]:
     """
-    Solves multiple Rush Hour games using the specified algorithm.
+    Removes the cycles of a solution and optionally shortens it by local
+    searches. Random walks and the weighted or fast Astar modes return
+    solutions that undo their own steps, which this makes usable without an
+    exact search.
+
+    Args:
+    ---------------------------------------------------------------------------
+        solution (List[RushHour]): The solution of the search.
+        result (Dict[str, float]): The statistics of the search.
+        postprocess (str): 'none', 'erase' or 'shorten'.
+        slide (bool): Whether the solution is made of multi-cell slides.
+        shorten_depth (int): Maximum number of steps of a shortcut.
+        start_time (float): Start of the solve, for the time of the result.
+
+    Returns:
+    ---------------------------------------------------------------------------
+        Tuple[List[RushHour], Dict[str, float]]: The post-processed solution
+        and its statistics, with the steps and moves of the solution of the
+        search as raw_steps and raw_moves.
+    """
+    if postprocess == 'none':
+        return solution, result
+    shortened = erase_loops(solution)
+    if postprocess == 'shorten':
+        shortened = shorten_path(shortened, shorten_depth, slide)
+    return shortened, dict(result, steps=len(shortened), moves=count_moves(shortened),\
+                           raw_steps=result["steps"], raw_moves=result["moves"],\
+                           time=time.perf_counter() - start_time)
+
+
+def solve_task(task: Task):
+    """
+    Solves a single game of a batch, in the main process or a worker.
+
+    Args:
+    ---------------------------------------------------------------------------
+        task (Task): The game, the algorithm, the keyword arguments of
+            solve_game, whether to return the solution, whether to detach its
+            states from their parents, so it can be sent back from a worker
+            process, and the database entry to verify the solution against.
+
+    Returns:
+    ---------------------------------------------------------------------------
+        Tuple[Optional[List[RushHour]], Dict[str, float], int]: The solution
+        if requested, the statistics and the status code of solve_game. A
+        verified solution adds its verification to the statistics.
+    """
+    game, algorithm, options, keep_solution, detach, entry = task
+    solution, result, unsolved = solve_game(game, algorithm, **options)
+    if entry is not None:
+        # replay in the worker, where the solution still exists
+        result = dict(result, verification=verify_solution(game, solution,\
+                                            algorithm, options, entry))
+    if not keep_solution:
+        solution = None
+    elif solution and detach:
+        # the parent chains would make the solution recursive to pickle
+        solution = [state.at_positions(state.positions) for state in solution]
+    return solution, result, unsolved
+
+
+def batch_tasks(rush_games: Iterable[RushHour], algorithm: str, repeat: int,\
+                options: Dict[str, any], seed: Optional[int], detach: bool,\
+                verify: bool =False) -> Iterator[Task]:
+    """
+    Lazily creates the tasks of a batch, one per game and repeat. Only the
+    last task returns its solution, which is found by looking one task ahead,
+    so the games are never all in memory.
+
+    Args:
+    ---------------------------------------------------------------------------
+        rush_games (Iterable[RushHour]): The games to solve, paired with
+            their database entries if verify is set.
+        algorithm (str): The algorithm to use for solving the games.
+        repeat (int): Number of times to repeat solving each game.
+        options (Dict[str, any]): Keyword arguments of solve_game.
+        seed (Optional[int]): Base seed of the Random algorithm.
+        detach (bool): Whether the solution is sent back from a worker.
+        verify (bool): Whether to verify the solutions.
+
+    Returns:
+    ---------------------------------------------------------------------------
+        Iterator[Task]: The tasks for solve_task.
+    """
+    number = 0
+    previous = None
+    for game_number, game in enumerate(rush_games):
+        entry = None
+        if verify:
+            game, entry = game
+        for repetition in range(repeat):
+            task_options = dict(options, seed=None if seed is None else seed + number)
+            number += 1
+            if previous is not None:
+                yield previous[:3] + (False, detach, previous[3])
+            task_entry = None if entry is None else\
+                dict(entry, game=game_number, repetition=repetition)
+            previous = (game, algorithm, task_options, task_entry)
+    if previous is not None:
+        yield previous[:3] + (True, detach, previous[3])
+
+
+def solve_tasks(tasks: List[Task]):
+    """
+    Solves a chunk of tasks in a worker.
+
+    Args:
+    ---------------------------------------------------------------------------
+        tasks (List[Task]): The tasks of the chunk.
+
+    Returns:
+    ---------------------------------------------------------------------------
+        List[Tuple[Optional[List[RushHour]], Dict[str, float], int]]: The
+        results of solve_task, in the order of the tasks.
+    """
+    return [solve_task(task) for task in tasks]
+
+
+def solve_parallel(tasks: Iterable[Task], workers: int, chunksize: int =4):
+    """
+    Solves tasks over a pool of processes and yields the results in the
+    order of the tasks. Only a few chunks per worker are in flight, so the
+    tasks are read as the results come in.
+
+    Args:
+    ---------------------------------------------------------------------------
+        tasks (Iterable[Task]): The tasks to solve.
+        workers (int): Number of processes.
+        chunksize (int): Number of tasks sent to a worker at once.
+
+    Returns:
+    ---------------------------------------------------------------------------
+        Iterator[Tuple[Optional[List[RushHour]], Dict[str, float], int]]: The
+        results of solve_task.
+    """
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        chunk = []
+        for task in tasks:
+            chunk.append(task)
+            if len(chunk) == chunksize:
+                pending.append(executor.submit(solve_tasks, chunk))
+                chunk = []
+                # wait for the oldest chunk once every worker has two queued
+                if len(pending) > 2 * workers:
+                    yield from pending.popleft().result()
+        if chunk:
+            pending.append(executor.submit(solve_tasks, chunk))
+        while pending:
+            yield from pending.popleft().result()
+
+
+def rollout_batch(game: RushHour, walks: int, slide: bool, seed: Optional[int],\
+                    max_iterations: int, keep_solution: bool):
+    """
+    Runs a batch of random walks of a game in lockstep in a worker.
+
+    Args:
+    ---------------------------------------------------------------------------
+        game (RushHour): The game to solve.
+        walks (int): Number of walks of the batch.
+        slide (bool): Walk with multi-cell slides instead of single steps.
+        seed (Optional[int]): Seed of the batch.
+        max_iterations (int): Maximum number of steps of a walk.
+        keep_solution (bool): Return the solution of the last walk.
+
+    Returns:
+    ---------------------------------------------------------------------------
+        Tuple[List[int], List[int], float, Optional[List[RushHour]]]: The
+        steps and moves of every walk, 0 for a walk that was not solved, the
+        time per walk and the solution of the last walk if it is kept.
+    """
+    start_time = time.perf_counter()
+    results = random_rollouts(game, walks, max_iterations, slide, seed)
+    walk_time = (time.perf_counter() - start_time) / walks
+    return results['steps'].tolist(), results['moves'].tolist(), walk_time,\
+                        results['solution'] if keep_solution else None
+
+
+def solve_rollouts(rush_games: Iterable[RushHour], repeat: int, slide: bool =False,\
+                    seed: Optional[int] =None, max_iterations: int =1000000,\
+                    workers: int =1):
+    """
+    Solves every game of a batch with the Random algorithm on the numpy
+    engine, running the repeats of a game as random walks in lockstep, in
+    batches of at most ROLLOUT_BATCH walks. With more than one worker the
+    batches are spread over a pool of processes, a few per worker in
+    flight. Every batch gets its own seed, so the walks do not depend on
+    the number of workers. Only the last walk of the last game returns its
+    solution, so the last result of a game is held back until the next
+    batch is solved.
+
+    Args:
+    ---------------------------------------------------------------------------
+        rush_games (Iterable[RushHour]): The games to solve.
+        repeat (int): Number of walks per game.
+        slide (bool): Walk with multi-cell slides instead of single steps.
+        seed (Optional[int]): Base seed of the walks, every batch gets the
+            seed plus the number of its first walk, counted over the games
+            as in batch_tasks.
+        max_iterations (int): Maximum number of steps of a walk.
+        workers (int): Number of processes.
+
+    Returns:
+    ---------------------------------------------------------------------------
+        Iterator[Tuple[Optional[List[RushHour]], Dict[str, float], int]]: The
+        results of every walk, as returned by solve_task. The time of a walk
+        is the time of its batch divided by the number of walks.
+    """
+    def batches():
+        for game_number, game in enumerate(rush_games):
+            for first in range(0, repeat, ROLLOUT_BATCH):
+                walks = min(ROLLOUT_BATCH, repeat - first)
+                yield game, walks, slide,\
+                    None if seed is None else seed + game_number * repeat + first,\
+                    max_iterations, first + walks == repeat
+
+    def run(executor: Optional[ProcessPoolExecutor]):
+        if executor is None:
+            yield from (rollout_batch(*batch) for batch in batches())
+            return
+        pending = deque()
+        for batch in batches():
+            pending.append(executor.submit(rollout_batch, *batch))
+            # wait for the oldest batch once every worker has two queued
+            if len(pending) > 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+    def walk_results(executor: Optional[ProcessPoolExecutor]):
+        held = None
+        for steps_list, moves_list, walk_time, solution in run(executor):
+            if held is not None:
+                yield held[1]
+                held = None
+            for index, (steps, moves) in enumerate(zip(steps_list, moves_list)):
+                if steps:
+                    result = (None, {"steps": steps, "moves": moves,\
+                                    "visited": steps - 1, "time": walk_time}, 0)
+                else:
+                    result = (None, {"steps": 0, "moves": 0, "visited": 0, "time": 0}, 1)
+                if solution is not None and index == len(steps_list) - 1:
+                    held = (solution, result)
+                else:
+                    yield result
+        if held is not None:
+            solution, result = held
+            yield ((solution,) + result[1:]) if solution else result
+
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            yield from walk_results(executor)
+    else:
+        yield from walk_results(None)
+
+
+def solve_rush_hour_games(rush_games: List[RushHour], algorithm: str, repeat: int,\
+                                engine: str ='object', slide: bool =False,\
+                                astar_mode: str ='fast', weight: float =1.0,\
+                                workers: int =1, seed: Optional[int] =None,\
+                                verify: bool =False,\
+                                report_path: str ='verification_report.json',\
+                                cache: Optional[str] =None,\
+                                memory_limit: Optional[int] =None,\
+                                postprocess: str ='none', shorten_depth: int =8,\
+                                mcts_iterations: Optional[int] =None,\
+                                time_limit: Optional[float] =None,\
+                                mcts_evaluate: bool =False,\
+                                beam_width: int =100, beam_restarts: int =0,\
+                                cluster_dir: Optional[str] =None):
+    """
+    Solves multiple Rush Hour games using the specified algorithm. With more
+    than one worker the games and repeats are spread over a pool of
+    processes, the statistics keep the order of the games. With verify every
+    solution is replayed and compared to the optimal number of moves of its
+    game, and the mismatches are written to a JSON report.
     
     Args:
     ---------------------------------------------------------------------------
-        rush_games (Generator[RushHour, None, None]): Generator of Rush Hour games.
+        rush_games (Generator[RushHour, None, None]): Generator of Rush Hour
+            games, paired with their database entries if verify is set.
         algorithm (str): The algorithm to use for solving the games.
         repeat (int): Number of times to repeat solving each game.
+        engine (str): State representation to search with, 'object',
+            'bitboard' or 'numpy', which runs the repeats of a game with
+            Random as walks in lockstep, in batches spread over the workers.
+        slide (bool): Search with multi-cell slides instead of single steps.
+        astar_mode (str): Heuristic mode of Astar and IDAstar, 'fast',
+            'weighted' or 'optimal'.
+        weight (float): Weight of the heuristic in the 'weighted' mode.
+        workers (int): Number of processes solving games in parallel. ParBFS
+            solves the games one by one and splits every search over the
+            processes instead.
+        seed (Optional[int]): Base seed of Random and MCTS, every solve
+            gets the seed plus its number, so a batch can be reproduced with
+            any number of workers.
+        verify (bool): Verify the solutions against the database.
+        report_path (str): Path of the JSON report of the verification.
+        cache (Optional[str]): Path of the solution cache, None to always
+            search.
+        memory_limit (Optional[int]): Maximum number of visited states BFS
+            keeps in memory before spilling them to disk, None for no limit.
+        postprocess (str): Post-processing of the solutions, 'none', 'erase'
+            or 'shorten'.
+        shorten_depth (int): Maximum number of steps of a shortcut.
+        mcts_iterations (Optional[int]): Maximum number of simulations of
+            MCTS per solve.
+        time_limit (Optional[float]): Maximum wall-clock time of MCTS per
+            solve in seconds.
+        mcts_evaluate (bool): Score the rollouts of MCTS with the heuristic
+            of Astar.
+        beam_width (int): Number of states Beam keeps per depth.
+        beam_restarts (int): Maximum number of restarts of Beam with a wider
+            beam.
+        cluster_dir (Optional[str]): Directory of the distance tables of the
+            Cluster algorithm, None to not keep them.
         
     Returns:
     ---------------------------------------------------------------------------
         Tuple[Dict[str, List[float]], int, List[Optional[Dict[str, any]]]]: Tuple 
         containing statistics, the count of unsolved games, and the list of solutions.
+        With post-processing the statistics add the raw_steps and raw_moves
+        of the solved games.
     """
     
-    stats = {"times": [], "steps": [], "visited": [],}
+    stats = {"times": [], "steps": [], "moves": [], "visited": [],}
+    if verify:
+        stats["gaps"] = []
+        mismatches = []
     unsolved_count = 0
     solutions = []
     game_count = 0 
+    layers = None
+    fallbacks = 0
+
+    # ParBFS runs its own worker processes for every game
+    search_workers = 1
+    if algorithm.lower() == 'parbfs':
+        search_workers, workers = workers, 1
+
+    # one task per game and repeat, only the last solution is returned
+    options = {"engine": engine, "slide": slide, "astar_mode": astar_mode,
+               "weight": weight, "workers": search_workers, "cache": cache,
+               "memory_limit": memory_limit, "postprocess": postprocess,
+               "shorten_depth": shorten_depth, "mcts_iterations": mcts_iterations,
+               "time_limit": time_limit, "mcts_evaluate": mcts_evaluate,
+               "beam_width": beam_width, "beam_restarts": beam_restarts,
+               "cluster_dir": cluster_dir}
+    tasks = batch_tasks(rush_games, algorithm, repeat, options, seed,\
+                                                workers > 1, verify)
 
     with tqdm(desc="Solving Games") as progress_bar:
-        for game in rush_games:
-            for _ in range(repeat):
-                solutions, result, unsolved = solve_game(game, algorithm)
-                stats["times"].append(result["time"])
-                stats["steps"].append(result["steps"])
-                stats["visited"].append(result["visited"])
-                unsolved_count += unsolved
-                game_count += 1
-                progress_bar.update(1)
-                progress_bar.set_description(f"Processed {game_count} games")
+        # the repeats of a game run as walks in lockstep, verification
+        # and post-processing need every solution so they solve the tasks
+        # one by one
+        if algorithm.lower() == 'random' and engine.lower() == 'numpy' and\
+                                        not verify and postprocess == 'none':
+            results = solve_rollouts(rush_games, repeat, slide, seed,\
+                                     workers=workers)
+        elif workers > 1:
+            results = solve_parallel(tasks, workers)
+        else:
+            results = map(solve_task, tasks)
+
+        for solution, result, unsolved in results:
+            if solution is not None:
+                solutions = solution
+            stats["times"].append(result["time"])
+            stats["steps"].append(result["steps"])
+            stats["moves"].append(result["moves"])
+            stats["visited"].append(result["visited"])
+            for key in ("raw_steps", "raw_moves"):
+                if key in result:
+                    stats.setdefault(key, []).append(result[key])
+            if "layer_times" in result:
+                layers = (result["depth_states"], result["layer_times"])
+            fallbacks += result.get("fallback", False)
+            if verify:
+                record = result["verification"]
+                if record["gap"] is not None:
+                    stats["gaps"].append(record["gap"])
+                if record["problems"]:
+                    mismatches.append(record)
+            unsolved_count += unsolved
+            game_count += 1
+            progress_bar.update(1)
+            progress_bar.set_description(f"Processed {game_count} games")
+
+    # the layers of the last search, for ParBFS
+    if layers is not None:
+        desc_layers(*layers)
+    if fallbacks:
+        print(f"{fallbacks} of {game_count} solves had too many goal states and fell back to breadth-first search")
+
+    if verify:
+        report = verification_report(stats["gaps"], mismatches, game_count,\
+                                     algorithm, options, astar_mode)
+        desc_verification(report)
+        with open(report_path, 'w') as file:
+            json.dump(report, file, indent=2)
+        print(f"Verification report saved as {report_path}")
 
     return stats, unsolved_count, solutions
+
+
+def verification_report(gaps: List[int], mismatches: List[Dict[str, any]],\
+                        solves: int, algorithm: str, options: Dict[str, any],\
+                        astar_mode: str) -> Dict[str, any]:
+    """
+    Summarises the verification of a batch.
+
+    Args:
+    ---------------------------------------------------------------------------
+        gaps (List[int]): The gap to the optimal number of moves of every
+            legal solution of a game with a known optimum.
+        mismatches (List[Dict[str, any]]): The verifications that found a
+            problem.
+        solves (int): The number of solves in the batch.
+        algorithm (str): The algorithm of the batch.
+        options (Dict[str, any]): Keyword arguments of solve_game.
+        astar_mode (str): Heuristic mode of Astar and IDAstar.
+
+    Returns:
+    ---------------------------------------------------------------------------
+        Dict[str, any]: The settings of the batch, the gap statistics and
+        the mismatches.
+    """
+    return {
+        "algorithm": algorithm,
+        "engine": options["engine"],
+        "slide": options["slide"],
+        "astar_mode": astar_mode,
+        "solves": solves,
+        "compared": len(gaps),
+        "optimal": sum(gap == 0 for gap in gaps),
+        "mean_gap": sum(gaps) / len(gaps) if gaps else None,
+        "max_gap": max(gaps) if gaps else None,
+        "mismatch_count": len(mismatches),
+        "mismatches": mismatches
+    }
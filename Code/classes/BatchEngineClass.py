@@ -0,0 +1,134 @@
+import numpy as np
+from typing import Tuple
+from Code.classes.TopologyClass import BoardTopology
+from Code.classes.StateCodecClass import StateCodec
+
+class BatchEngine(object):
+    """
+    Move generation for a whole frontier at once with NumPy. A frontier is
+    a 2D array with one row per state and the position of every vehicle in
+    the columns, in topology order. The occupancy of all states is built
+    with one scatter per vehicle cell, and the successors of every state are
+    found per vehicle and direction with array operations.
+
+    Attributes:
+    ---------------------------------------------------------------------------
+        topology (BoardTopology): The board of the states.
+        lane_cells (np.ndarray): Per vehicle, the cell index at every
+            coordinate along its lane, shifted by one and padded on both
+            sides with a cell that is always occupied.
+        shifts (Optional[np.ndarray]): Bit offset of every vehicle in the
+            packed keys, None if a state does not fit in 64 bits.
+    """
+
+    def __init__(self, topology: BoardTopology):
+        """
+        Builds the lookup tables of a board.
+
+        Args:
+        -----------------------------------------------------------------------
+            topology (BoardTopology): The board.
+        """
+        self.topology = topology
+        dimension = topology.dim_board
+        # the last cell of the occupancy is off the board and always taken
+        self.off_board = dimension * dimension
+        lane_cells = np.full((len(topology.ids), dimension + 2), self.off_board,\
+                                                                dtype=np.intp)
+        for i in range(len(topology.ids)):
+            for j in range(dimension):
+                x, y = topology.cell(i, j)
+                lane_cells[i, j + 1] = y * dimension + x
+        self.lane_cells = lane_cells
+
+        codec = StateCodec(topology)
+        self.shifts = np.array(codec.shifts, dtype=np.uint64)\
+                                    if sum(codec.bits) <= 64 else None
+
+    def occupancy(self, frontier: np.ndarray) -> np.ndarray:
+        """
+        Computes the occupied cells of every state, the walls included.
+
+        Args:
+        -----------------------------------------------------------------------
+            frontier (np.ndarray): The positions of the states.
+
+        Returns:
+        -----------------------------------------------------------------------
+            np.ndarray: A boolean array with a row per state and a column per
+            cell, plus the always occupied cell off the board.
+        """
+        rows = np.arange(len(frontier))
+        occupied = np.zeros((len(frontier), self.off_board + 1), dtype=bool)
+        occupied[:, self.off_board] = True
+        for x, y in self.topology.walls:
+            occupied[:, y * self.topology.dim_board + x] = True
+        for i, length in enumerate(self.topology.lengths):
+            lane = self.lane_cells[i]
+            positions = frontier[:, i].astype(np.intp)
+            for j in range(length):
+                occupied[rows, lane[positions + j + 1]] = True
+        return occupied
+
+    def successors(self, frontier: np.ndarray, slide: bool =False)\
+                                        -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Generates the successors of every state of a frontier.
+
+        Args:
+        -----------------------------------------------------------------------
+            frontier (np.ndarray): The positions of the states.
+            slide (bool): Generate multi-cell slides instead of single steps.
+
+        Returns:
+        -----------------------------------------------------------------------
+            Tuple[np.ndarray, np.ndarray]: The positions of the successors,
+            grouped by vehicle and direction, and the row of the state every
+            successor was generated from.
+        """
+        rows = np.arange(len(frontier))
+        occupied = self.occupancy(frontier)
+        dimension = self.topology.dim_board
+        children, parents = [], []
+
+        for i, length in enumerate(self.topology.lengths):
+            lane = self.lane_cells[i]
+            positions = frontier[:, i].astype(np.intp)
+            # backward (left or down) first, then forward (right or up)
+            for direction, first_cell in ((-1, positions), (1, positions + length + 1)):
+                free = np.ones(len(frontier), dtype=bool)
+                for distance in range(1, dimension if slide else 2):
+                    cells = np.clip(first_cell + direction * (distance - 1),\
+                                                        0, dimension + 1)
+                    free &= ~occupied[rows, lane[cells]]
+                    moving = np.flatnonzero(free)
+                    if not len(moving):
+                        break
+                    moved = frontier[moving].copy()
+                    moved[:, i] = positions[moving] + direction * distance
+                    children.append(moved)
+                    parents.append(moving)
+
+        if not children:
+            return np.empty((0, frontier.shape[1]), dtype=frontier.dtype),\
+                   np.empty(0, dtype=np.intp)
+        return np.concatenate(children), np.concatenate(parents)
+
+    def keys(self, frontier: np.ndarray) -> np.ndarray:
+        """
+        Gets a sortable key of every state, the positions packed into 64
+        bits as in StateCodec, or the bytes of the row on larger boards.
+
+        Args:
+        -----------------------------------------------------------------------
+            frontier (np.ndarray): The positions of the states.
+
+        Returns:
+        -----------------------------------------------------------------------
+            np.ndarray: A key per state, equal keys for equal states.
+        """
+        if self.shifts is not None:
+            return (frontier.astype(np.uint64) << self.shifts).sum(axis=1,\
+                                                            dtype=np.uint64)
+        rows = np.ascontiguousarray(frontier, dtype=np.uint8)
+        return rows.view(f'S{rows.shape[1]}').ravel()
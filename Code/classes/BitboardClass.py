@@ -0,0 +1,384 @@
+from typing import Tuple, Set, List, Iterable
+from bisect import insort
+from Code.classes.VehicleClass import Vehicle, VehicleView
+from Code.classes.RushClass import RushHour
+from Code.classes.TopologyClass import BoardTopology
+
+class BitboardRushHour(object):
+    """
+    Represents a single Rush Hour board configuration as integers: the
+    occupancy of the board is one integer with a bit per cell and the vehicles
+    are a tuple of positions along their lanes. Offers the same interface as
+    RushHour, so the solvers can run on either representation.
+
+    Attributes:
+    ---------------------------------------------------------------------------
+        topology (BoardTopology): Static description of the board.
+        positions (Tuple[int, ...]): Free coordinate of every vehicle.
+        occupied (int): Bitboard of the occupied cells.
+        dim_board (int): Dimension of the board (6, 9, or 12).
+        parent (Optional[BitboardRushHour]): Parent state if current state has
+        parent.
+        moved (Optional[int]): Index of the vehicle moved from the parent
+        state, None for an initial state.
+        blocked_by (Optional[Tuple[FrozenSet[int], ...]]): Per vehicle the
+        indices of the vehicles blocking it, filled in by Astar on first use.
+    """
+    __slots__ = ('topology', 'positions', 'dim_board', 'parent', 'occupied',\
+                 'moved', 'blocked_by', '_hash', '_blockers')
+
+    def __init__(self, topology: BoardTopology, positions: Tuple[int, ...],\
+                        parent: 'BitboardRushHour' = None, occupied: int = None,\
+                        moved: int = None):
+        """
+        Initializes a bitboard Rush Hour state.
+
+        Args:
+        -----------------------------------------------------------------------
+            topology (BoardTopology): Static description of the board.
+            positions (Tuple[int, ...]): Free coordinate of every vehicle.
+            parent (Optional[BitboardRushHour]): The parent state, default is
+            None.
+            occupied (Optional[int]): Bitboard of the occupied cells, computed
+            from the positions and the walls if None.
+            moved (Optional[int]): Index of the vehicle moved from the parent
+            state, default is None.
+        """
+        self.topology = topology
+        self.positions = positions
+        self.dim_board = topology.dim_board
+        self.parent = parent
+        if occupied is None:
+            occupied = topology.wall_bits
+            for masks, position in zip(topology.masks, positions):
+                occupied |= masks[position]
+        self.occupied = occupied
+        self.moved = moved
+        self.blocked_by = None
+        self._hash = hash(positions)
+        self._blockers = None
+
+    @classmethod
+    def from_rush_hour(cls, state: RushHour) -> 'BitboardRushHour':
+        """
+        Converts an object based RushHour state to a bitboard state.
+
+        Args:
+        -----------------------------------------------------------------------
+            state (RushHour): The state to convert.
+
+        Returns:
+        -----------------------------------------------------------------------
+            BitboardRushHour: The equivalent bitboard state.
+        """
+        return cls(state.topology, state.positions)
+
+    def to_rush_hour(self) -> RushHour:
+        """
+        Converts the state back to the object based RushHour model, e.g. for
+        visualisation.
+
+        Returns:
+        -----------------------------------------------------------------------
+            RushHour: The equivalent RushHour state, without parent.
+        """
+        return RushHour(None, self.dim_board, topology=self.topology,\
+                        positions=self.positions)
+
+    def at_positions(self, positions: Tuple[int, ...]) -> 'BitboardRushHour':
+        """
+        Creates a state of the same board with the vehicles at other positions
+        along their lanes.
+
+        Args:
+        -----------------------------------------------------------------------
+            positions (Tuple[int, ...]): Free coordinate of every vehicle.
+
+        Returns:
+        -----------------------------------------------------------------------
+            BitboardRushHour: The new state, without parent.
+        """
+        return BitboardRushHour(self.topology, positions)
+
+    @property
+    def vehicles(self) -> List[VehicleView]:
+        """
+        Sorted list of the vehicles on the board, as views shared by all
+        states of the board.
+        """
+        views = self.topology.views
+        return [views[i][p] for i, p in enumerate(self.positions)]
+
+    @property
+    def red_car(self) -> VehicleView:
+        """
+        The red car in the game.
+        """
+        index = self.topology.red_index
+        return self.topology.vehicle(index, self.positions[index])
+
+    @property
+    def blockers(self) -> List[Vehicle]:
+        """
+        Vehicles blocking the red car's path to the exit, computed on first
+        access. Unless the red car moved, only the moved vehicle is checked
+        against the blockers of the parent.
+        """
+        if self._blockers is None:
+            parent = self.parent
+            moved = self.moved
+            if parent is not None and moved is not None and\
+                    parent._blockers is not None and\
+                    moved != self.topology.red_index:
+                self._blockers = [v for v in parent.blockers
+                                  if v.id != self.topology.ids[moved]]
+                if self._is_blocking_red(moved):
+                    insort(self._blockers, self.topology.vehicle(moved, self.positions[moved]))
+            else:
+                self._blockers = [self.topology.vehicle(i, position)
+                                  for i, position in enumerate(self.positions)
+                                  if self._is_blocking_red(i)]
+        return self._blockers
+
+    def _is_blocking_red(self, i: int) -> bool:
+        """
+        Checks if vehicle i blocks the path of the red car to the exit.
+
+        Args:
+        -----------------------------------------------------------------------
+            i (int): Index of the vehicle in the topology.
+
+        Returns:
+        -----------------------------------------------------------------------
+            bool: True if the vehicle is blocking the red car, False otherwise.
+        """
+        topology = self.topology
+        red_x = self.positions[topology.red_index]
+        red_y = topology.lanes[topology.red_index]
+        position = self.positions[i]
+        # horizontal cars can not block the red car
+        if topology.orientations[i] == 'V' and topology.lanes[i] > red_x + 1:
+            return position == red_y - 1 or position == red_y or\
+                    (position == red_y - 2 and topology.lengths[i] == 3)
+        return False
+
+    def __eq__(self, other: 'BitboardRushHour') -> bool:
+        """
+        Checks equality with another state based on vehicle positions.
+
+        Args:
+        -----------------------------------------------------------------------
+            other (BitboardRushHour): Another state to compare with.
+
+        Returns:
+        -----------------------------------------------------------------------
+            bool: True if the vehicles are in the same positions,
+            False otherwise.
+        """
+        if not isinstance(other, BitboardRushHour):
+            return False
+        return self.positions == other.positions
+
+    def __ne__(self, other: 'BitboardRushHour') -> bool:
+        """
+        Checks inequality with another state.
+
+        Args:
+        -----------------------------------------------------------------------
+            other (BitboardRushHour): Another state to compare with.
+
+        Returns:
+        -----------------------------------------------------------------------
+            bool: True if vehicles are not in the same positions,
+            False otherwise.
+        """
+        return not self.__eq__(other)
+
+    def __hash__(self) -> int:
+        """
+        Hash of the board state, computed once from the positions.
+
+        Returns:
+        -----------------------------------------------------------------------
+            int: The hash value of the board state.
+        """
+        return self._hash
+
+    def __repr__(self) -> str:
+        """
+        Provides a string representation of the board state.
+
+        Returns:
+        -----------------------------------------------------------------------
+            str: The string representation of the board.
+        """
+        board_str = '-' * (self.dim_board + 2) + '\n'
+        for row in self.get_board():
+            board_str += '|' + ''.join(row) + '|\n'
+        board_str += '-' * (self.dim_board + 2)
+        return board_str
+
+    def get_board(self) -> List[List[str]]:
+        """
+        Generates a 2D list representation of the board with empty tiles,
+        walls as 'x' and vehicle ids.
+
+        Returns:
+        -----------------------------------------------------------------------
+            List[List[str]]: The 2D list representing the board.
+        """
+        topology = self.topology
+        board = [[' ' for _ in range(self.dim_board)] for _ in range(self.dim_board)]
+        for x, y in topology.walls:
+            board[y][x] = 'x'
+        for i, position in enumerate(self.positions):
+            for j in range(position, position + topology.lengths[i]):
+                if topology.orientations[i] == 'H':
+                    board[topology.lanes[i]][j] = topology.ids[i]
+                else:
+                    board[j][topology.lanes[i]] = topology.ids[i]
+        return board
+
+    def moves(self) -> Iterable['BitboardRushHour']:
+        """
+        Generates possible next moves (states) from the current state, in the
+        same order as RushHour.moves.
+
+        Returns:
+        -----------------------------------------------------------------------
+            Iterable[BitboardRushHour]: An iterable of states after the
+            possible moves.
+        """
+        topology = self.topology
+        occupied = self.occupied
+        positions = self.positions
+        for i, position in enumerate(positions):
+            # look up the moves of the vehicle from its current position
+            for new_position, free_bit, toggle in topology.bit_move_table[i][position]:
+                if not occupied & free_bit:
+                    yield BitboardRushHour(topology,
+                        positions[:i] + (new_position,) + positions[i + 1:],
+                        self, occupied ^ toggle, i)
+
+    def slide_moves(self) -> Iterable['BitboardRushHour']:
+        """
+        Generates the next states reached by sliding a single vehicle any
+        number of free cells, in the same order as RushHour.slide_moves.
+
+        Returns:
+        -----------------------------------------------------------------------
+            Iterable[BitboardRushHour]: An iterable of states after the
+            possible slides.
+        """
+        topology = self.topology
+        occupied = self.occupied
+        positions = self.positions
+        for i, position in enumerate(positions):
+            for direction in topology.bit_slide_table[i][position]:
+                for new_position, free_bit, toggle in direction:
+                    # the vehicle can not slide past an occupied cell
+                    if occupied & free_bit:
+                        break
+                    yield BitboardRushHour(topology,
+                        positions[:i] + (new_position,) + positions[i + 1:],
+                        self, occupied ^ toggle, i)
+
+    def generate_future_states(self, current_state: 'BitboardRushHour',\
+                        depth=3, slide: bool =False) -> List['BitboardRushHour']:
+        """
+        Generates future states from the current state up to a specified depth.
+
+        Args:
+        -----------------------------------------------------------------------
+            current_state (BitboardRushHour): The current state.
+            depth (int): The depth for lookahead from the current state.
+            slide (bool): Generate multi-cell slides instead of single steps.
+
+        Returns:
+        -----------------------------------------------------------------------
+            List[BitboardRushHour]: A list of future states.
+        """
+        if depth == 0:
+            return [current_state]
+        future_states = []
+        next_states = current_state.slide_moves() if slide else current_state.moves()
+        for next_state in next_states:
+            future_states.extend(self.generate_future_states(next_state, depth - 1, slide))
+        return future_states
+
+    def is_solved(self) -> bool:
+        """
+        Checks if the puzzle is solved, by checking if the red car is at the
+        exit.
+
+        Returns:
+        -----------------------------------------------------------------------
+            bool: True if the puzzle is solved, False otherwise.
+        """
+        index = self.topology.red_index
+        return self.positions[index] + self.topology.lengths[index] == self.dim_board
+
+    def _cells_free(self, coords: Set[Tuple[int, int]]) -> bool:
+        """
+        Checks if none of the given coordinates is occupied.
+
+        Args:
+        -----------------------------------------------------------------------
+            coords (Set[Tuple[int, int]]): Coordinates to check.
+
+        Returns:
+        -----------------------------------------------------------------------
+            bool: True if all coordinates on the board are free.
+        """
+        dim = self.dim_board
+        for x, y in coords:
+            if 0 <= x < dim and 0 <= y < dim and\
+                    self.occupied >> (y * dim + x) & 1:
+                return False
+        return True
+
+    def is_solvable(self) -> bool:
+        """
+        Checks if the game is in a directly solvable state, with the same
+        rules as RushHour.is_solvable.
+
+        Returns:
+        -----------------------------------------------------------------------
+            bool: True if the game is solvable from the current state, False
+            otherwise.
+        """
+        blockers = self.blockers
+        exit_row = self.topology.lanes[self.topology.red_index]
+        if not blockers: return True
+        if self.dim_board == 9 or self.dim_board == 12:
+            for blocker in blockers:
+                if blocker.length == 3:
+                    if blocker.y == exit_row - 2:
+                        coords_up = {(blocker.x, blocker.y - 1)}
+                        coords_down = {(blocker.x, blocker.y + i) for i in range(3, 6)}
+                    elif blocker.y == exit_row - 1:
+                        coords_up = {(blocker.x, blocker.y - i) for i in range(1,3)}
+                        coords_down = {(blocker.x, blocker.y + i) for i in range(3, 5)}
+                    elif blocker.y == exit_row:
+                        coords_up = {(blocker.x, blocker.y - i) for i in range(1,4)}
+                        coords_down = {(blocker.x, blocker.y + 3)}
+                if blocker.length == 2:
+                    if blocker.y == exit_row - 1:
+                        coords_up = {(blocker.x, blocker.y - 1)}
+                        coords_down = {(blocker.x, blocker.y + i) for i in range(2,4)}
+                    elif blocker.y == exit_row:
+                        coords_up = {(blocker.x, blocker.y - i) for i in range(1,3)}
+                        coords_down = {(blocker.x, blocker.y + 2)}
+                if not (self._cells_free(coords_up) and self._cells_free(coords_down)):
+                    return False
+            return True
+
+        # for 6x6 boards
+        if self.dim_board == 6 and blockers[0].x == 5:
+            blocker = blockers[0]
+            if blocker.y == 0:
+                return self._cells_free({(5, 3), (5, 4), (5, 5)})
+            if blocker.y == 1:
+                return self._cells_free({(5, 4), (5, 5)})
+            if blocker.y == 2:
+                return self._cells_free({(5, 5)})
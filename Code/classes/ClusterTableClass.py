@@ -0,0 +1,230 @@
+import os
+import glob
+import hashlib
+import numpy as np
+from typing import List, Optional, Tuple, Union
+from Code.classes.RushClass import RushHour
+from Code.classes.BitboardClass import BitboardRushHour
+from Code.classes.TopologyClass import BoardTopology
+from Code.classes.StateCodecClass import StateCodec
+
+class ClusterTable(object):
+    """
+    Exact distance to the nearest solved state for every state of a cluster,
+    the set of states reachable from one another by moves. The states are
+    packed into fixed-width byte strings by their StateCodec, sorted, and
+    stored next to their distances in two arrays that are memory-mapped from
+    disk, so a lookup is a binary search that only reads the pages it
+    touches.
+
+    Attributes:
+    ---------------------------------------------------------------------------
+        path (str): Path prefix of the stored arrays.
+        keys (np.ndarray): Sorted packed states of the cluster.
+        distances (np.ndarray): Distance of every state in steps, or in moves
+            for a slide table, -1 if no solved state can be reached.
+        codec (Optional[StateCodec]): Codec of the last looked up board.
+    """
+    # distance of the states that can not reach a solved state
+    UNSOLVABLE = -1
+
+    def __init__(self, path: str):
+        """
+        Opens a stored table.
+
+        Args:
+        -----------------------------------------------------------------------
+            path (str): Path prefix of the stored arrays.
+        """
+        self.path = path
+        self.codec = None
+        self.keys = np.load(path + '.keys.npy', mmap_mode='r')
+        self.distances = np.load(path + '.distances.npy', mmap_mode='r')
+
+    @staticmethod
+    def board_prefix(topology: BoardTopology, slide: bool) -> str:
+        """
+        Names the tables of a board, from a digest of its vehicles without
+        their positions and of its walls, which is the same in every process.
+
+        Args:
+        -----------------------------------------------------------------------
+            topology (BoardTopology): The board.
+            slide (bool): Whether the distances are in moves.
+
+        Returns:
+        -----------------------------------------------------------------------
+            str: The name shared by all tables of the board.
+        """
+        encoding = f"{topology.dim_board}:" + ";".join(
+            f"{i},{o},{lane},{length}" for i, o, lane, length in zip(
+                topology.ids, topology.orientations, topology.lanes, topology.lengths))
+        if topology.walls:
+            encoding += "|" + ";".join(f"{x},{y}" for x, y in topology.walls)
+        digest = hashlib.sha256(encoding.encode()).hexdigest()[:16]
+        return digest + ('-moves' if slide else '-steps')
+
+    @classmethod
+    def build(cls, RushGame: Union[RushHour, BitboardRushHour], directory: str,\
+                    slide: bool =False, max_states: int =10000000) -> Optional['ClusterTable']:
+        """
+        Enumerates the cluster of a state by breadth-first search, computes
+        the distance of every state by a breadth-first search backwards from
+        all solved states, and stores the table. Moves can be reversed, so
+        the backward search uses the same moves.
+
+        Args:
+        -----------------------------------------------------------------------
+            RushGame (Union[RushHour, BitboardRushHour]): Any state of the
+                cluster.
+            directory (str): Directory to store the table in.
+            slide (bool): Count the distances in multi-cell slides instead of
+                single steps.
+            max_states (int): The maximum size of the cluster.
+
+        Returns:
+        -----------------------------------------------------------------------
+            Optional[ClusterTable]: The stored table, or None if the cluster
+            is too large.
+        """
+        topology = RushGame.topology
+        codec = StateCodec(topology)
+        red = topology.red_index
+        exit_position = RushGame.dim_board - topology.lengths[red]
+
+        # enumerate the cluster, keeping the positions of every state
+        cluster = {RushGame.positions}
+        level = [RushGame]
+        while level:
+            next_level = []
+            for state in level:
+                for move in (state.slide_moves() if slide else state.moves()):
+                    if move.positions not in cluster:
+                        cluster.add(move.positions)
+                        next_level.append(move)
+            if len(cluster) > max_states:
+                print(f"Cluster larger than {max_states} states")
+                return None
+            level = next_level
+
+        # search backwards from all solved states at once
+        distance = {positions: 0 for positions in cluster
+                    if positions[red] == exit_position}
+        level = list(distance)
+        depth = 0
+        while level:
+            depth += 1
+            next_level = []
+            for positions in level:
+                state = RushGame.at_positions(positions)
+                for move in (state.slide_moves() if slide else state.moves()):
+                    if move.positions not in distance:
+                        distance[move.positions] = depth
+                        next_level.append(move.positions)
+            level = next_level
+
+        keys = np.frombuffer(b''.join(codec.to_bytes(positions) for positions in cluster),\
+                             dtype=f'S{codec.width}')
+        distances = np.fromiter((distance.get(positions, cls.UNSOLVABLE)\
+                                 for positions in cluster), dtype=np.int16,\
+                                 count=len(cluster))
+        order = np.argsort(keys)
+        keys, distances = keys[order], distances[order]
+
+        # the smallest state names the cluster, whichever member built it
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{cls.board_prefix(topology, slide)}-{keys[:1].tobytes().hex()}")
+        np.save(path + '.keys.npy', keys)
+        np.save(path + '.distances.npy', distances)
+        return cls(path)
+
+    @classmethod
+    def find(cls, RushGame: Union[RushHour, BitboardRushHour], directory: str,\
+                                    slide: bool =False) -> Optional['ClusterTable']:
+        """
+        Finds the stored table of the cluster of a state.
+
+        Args:
+        -----------------------------------------------------------------------
+            RushGame (Union[RushHour, BitboardRushHour]): A state.
+            directory (str): Directory of the stored tables.
+            slide (bool): Whether the distances are in moves.
+
+        Returns:
+        -----------------------------------------------------------------------
+            Optional[ClusterTable]: The table containing the state, or None.
+        """
+        prefix = os.path.join(directory, cls.board_prefix(RushGame.topology, slide))
+        dtype = np.dtype(f'S{StateCodec(RushGame.topology).width}')
+        for keys_path in sorted(glob.glob(prefix + '-*.keys.npy')):
+            table = cls(keys_path[:-len('.keys.npy')])
+            # tables stored with keys of another format are rebuilt
+            if table.keys.dtype != dtype:
+                continue
+            if table.distance(RushGame) is not None:
+                return table
+        return None
+
+    def distance(self, RushGame: Union[RushHour, BitboardRushHour]) -> Optional[int]:
+        """
+        Looks up the distance of a state.
+
+        Args:
+        -----------------------------------------------------------------------
+            RushGame (Union[RushHour, BitboardRushHour]): A state.
+
+        Returns:
+        -----------------------------------------------------------------------
+            Optional[int]: The distance to the nearest solved state, -1 if
+            it can not be solved, or None if the state is not in the cluster.
+        """
+        if self.codec is None or self.codec.topology is not RushGame.topology:
+            self.codec = StateCodec(RushGame.topology)
+        key = np.array(self.codec.to_bytes(RushGame.positions), dtype=self.keys.dtype)
+        index = int(np.searchsorted(self.keys, key))
+        if index == len(self.keys) or self.keys[index] != key:
+            return None
+        return int(self.distances[index])
+
+    def descend(self, RushGame: Union[RushHour, BitboardRushHour], slide: bool =False)\
+                    -> Tuple[Optional[List[Union[RushHour, BitboardRushHour]]], int]:
+        """
+        Follows the distances down to a solved state, always moving to a
+        next state one closer, which gives an optimal solution.
+
+        Args:
+        -----------------------------------------------------------------------
+            RushGame (Union[RushHour, BitboardRushHour]): The start state.
+            slide (bool): Whether the distances are in moves.
+
+        Returns:
+        -----------------------------------------------------------------------
+            Tuple[Optional[List[Union[RushHour, BitboardRushHour]]], int]: The
+            solution path, None if the state can not be solved, and the
+            number of states looked up.
+        """
+        distance = self.distance(RushGame)
+        lookups = 1
+        if distance is None or distance == self.UNSOLVABLE:
+            return None, lookups
+        path = [RushGame]
+        state = RushGame
+        while distance > 0:
+            for move in (state.slide_moves() if slide else state.moves()):
+                lookups += 1
+                if self.distance(move) == distance - 1:
+                    state = move
+                    break
+            distance -= 1
+            path.append(state)
+        return path, lookups
+
+    def __len__(self) -> int:
+        """
+        Gets the number of states in the cluster.
+
+        Returns:
+        -----------------------------------------------------------------------
+            int: The number of states.
+        """
+        return len(self.keys)
@@ -0,0 +1,121 @@
+import os
+import struct
+from array import array
+
+class LineIndex(object):
+    """
+    Byte offsets of the lines of a text file, so any line can be read with a
+    single seek. The offsets are built once, by streaming the file, and
+    persisted next to it. The persisted index records the size and
+    modification time of the file and is rebuilt when these change.
+
+    Attributes:
+    ---------------------------------------------------------------------------
+        file_path (str): Path to the indexed text file.
+        index_path (str): Path to the persisted index.
+        total_lines (int): Number of lines in the file.
+    """
+    # size and modification time of the indexed file, then one offset per
+    # line, in the native byte order as the index is a local cache
+    HEADER = struct.Struct('=QQ')
+    OFFSET = struct.Struct('=Q')
+
+    def __init__(self, file_path: str):
+        """
+        Opens the index of a file, building it if it is missing or stale.
+
+        Args:
+        -----------------------------------------------------------------------
+            file_path (str): Path to the text file.
+        """
+        self.file_path = file_path
+        self.index_path = file_path + '.idx'
+        status = os.stat(file_path)
+        self._stamp = (status.st_size, status.st_mtime_ns)
+        # offsets kept in memory if the index can not be written to disk
+        self._offsets = None
+        self._index_file = None
+
+        if not self._is_current():
+            self.build()
+        if self._offsets is None:
+            self._index_file = open(self.index_path, 'rb')
+            size = os.path.getsize(self.index_path)
+            self.total_lines = (size - self.HEADER.size) // self.OFFSET.size
+        else:
+            self.total_lines = len(self._offsets)
+
+    def _is_current(self) -> bool:
+        """
+        Checks if the persisted index belongs to the current file.
+
+        Returns:
+        -----------------------------------------------------------------------
+            bool: True if the index exists and matches the file.
+        """
+        try:
+            with open(self.index_path, 'rb') as index_file:
+                header = index_file.read(self.HEADER.size)
+        except OSError:
+            return False
+        return len(header) == self.HEADER.size and\
+            self.HEADER.unpack(header) == self._stamp
+
+    def build(self) -> None:
+        """
+        Builds the index by streaming the file once, and persists it next to
+        the file. The index is kept in memory if it can not be written.
+        """
+        offsets = array('Q')
+        offset = 0
+        with open(self.file_path, 'rb') as file:
+            for line in file:
+                offsets.append(offset)
+                offset += len(line)
+
+        temporary_path = self.index_path + '.tmp'
+        try:
+            with open(temporary_path, 'wb') as index_file:
+                index_file.write(self.HEADER.pack(*self._stamp))
+                offsets.tofile(index_file)
+            # replace the old index at once, so readers never see half of it
+            os.replace(temporary_path, self.index_path)
+        except OSError:
+            self._offsets = offsets
+
+    def offset(self, line_number: int) -> int:
+        """
+        Gets the byte offset of a line.
+
+        Args:
+        -----------------------------------------------------------------------
+            line_number (int): The number of the line, starting at 0.
+
+        Returns:
+        -----------------------------------------------------------------------
+            int: The offset of the first byte of the line in the file.
+        """
+        if not 0 <= line_number < self.total_lines:
+            raise IndexError(f"Line {line_number} is not in {self.file_path}")
+        if self._offsets is not None:
+            return self._offsets[line_number]
+        self._index_file.seek(self.HEADER.size + line_number * self.OFFSET.size)
+        return self.OFFSET.unpack(self._index_file.read(self.OFFSET.size))[0]
+
+    def __len__(self) -> int:
+        """
+        Gets the number of lines in the file.
+
+        Returns:
+        -----------------------------------------------------------------------
+            int: The number of lines.
+        """
+        return self.total_lines
+
+    def close(self) -> None:
+        """
+        Closes the persisted index.
+        """
+        if self._index_file is not None:
+            self._index_file.close()
+            self._index_file = None
@@ -1,25 +1,40 @@
 from typing import Tuple, Set, Optional, List, Iterable
 from bisect import insort
-from Code.classes.VehicleClass import Vehicle
+from Code.classes.VehicleClass import Vehicle, VehicleView
+from Code.classes.TopologyClass import BoardTopology
 
 class RushHour(object):
     """
-    Represents a single Rush Hour board configuration.
+    Represents a single Rush Hour board configuration. The red car, the
+    blockers and the hash are only computed when first needed, as most
+    generated states are discarded as duplicates right away. A state only
+    stores the position of every vehicle along its lane, the rest of the
+    vehicles is stored once in the topology of the board.
     
     Attributes:
     ---------------------------------------------------------------------------
-        vehicles (List[Vehicle]): Sorted list of vehicles on the board.
+        positions (Tuple[int, ...]): Free coordinate of every vehicle, in
+        topology order.
+        vehicles (List[VehicleView]): Sorted list of vehicles on the board.
         dim_board (int): Dimension of the board (6, 9, or 12).
         parent (Optional[RushHour]): Parent state if current state has parent.
-        occupied_coords (Set[Tuple[int, int]]): Set of occupied coordinates on 
-        the board.
-        red_car (Optional[Vehicle]): The red car in the game.
-        blockers (List[Vehicle]): Vehicles blocking the red car's path to the 
+        red_car (VehicleView): The red car in the game.
+        blockers (List[VehicleView]): Vehicles blocking the red car's path to the 
         exit.
+        topology (BoardTopology): Precomputed move tables of the board, shared
+        by all states of the same game.
+        moved (Optional[int]): Index of the vehicle moved from the parent
+        state, None for an initial state.
+        blocked_by (Optional[Tuple[FrozenSet[int], ...]]): Per vehicle the
+        indices of the vehicles blocking it, filled in by Astar on first use.
     """
+    __slots__ = ('positions', 'dim_board', 'parent', 'moved', 'blocked_by',\
+                 'topology', '_blockers', '_hash')
 
     def __init__(self, vehicles: set, dimension: int, parent: 'RushHour' = None,\
-                                                occupied_coords: set = None):
+                topology: BoardTopology = None, moved: int = None,\
+                positions: Tuple[int, ...] = None,\
+                walls: Iterable[Tuple[int, int]] = ()):
         """
         Initializes a Rush Hour board state.
 
@@ -28,21 +43,28 @@ class RushHour(object):
             vehicles (Set[Vehicle]): A set of vehicles.
             dimension (int): The dimension of the board.
             parent (Optional[RushHour]): The parent state, default is None.
-            occupied_coords (Optional[Set[Tuple[int, int]]]): set 
-            of occupied coordinates, default is None.
-        """
-        # self.vehicles = vehicles
-        self.vehicles = sorted(vehicles, key=lambda v: v.id)
+            topology (Optional[BoardTopology]): The topology of the board,
+            computed from the vehicles if None.
+            moved (Optional[int]): Index of the vehicle moved from the parent
+            state, default is None.
+            positions (Optional[Tuple[int, ...]]): Free coordinate of every
+            vehicle in topology order, which replaces the vehicles if given.
+            walls (Iterable[Tuple[int, int]]): The wall cells of the board,
+            used if the topology is computed.
+        """
+        # build the move tables once per board, children share the parent's
+        if topology is None:
+            topology = BoardTopology(vehicles, dimension, walls)
+        self.topology = topology
+        if positions is None:
+            positions = topology.positions_of(vehicles)
+        self.positions = positions
         self.dim_board = dimension
         self.parent = parent
-        self.red_car = self.get_red_car()
-        self.blockers = self.get_cars_blocking_red()
-        # get occupied coordinates from vehicles if first initialisation of 
-        # the game
-        if occupied_coords == None:
-            self.occupied_coords = self.get_occupied_coords_set()
-        else: 
-            self.occupied_coords = occupied_coords
+        self.moved = moved
+        self.blocked_by = None
+        self._blockers = None
+        self._hash = None
 
     def get_vehicle_coords(self, vehicle: Vehicle) -> Tuple[int, int]:
         """
@@ -60,16 +82,38 @@ class RushHour(object):
                 else (vehicle.x, vehicle.y + i) 
             for i in range(vehicle.length)}
 
+    @property
+    def occupied(self) -> int:
+        """
+        Bitboard of the cells occupied by vehicles or walls, derived from the
+        positions on every access, so states do not store their occupancy.
+        """
+        occupied = self.topology.wall_bits
+        for masks, position in zip(self.topology.masks, self.positions):
+            occupied |= masks[position]
+        return occupied
+
+    @property
+    def occupied_coords(self) -> Set[Tuple[int, int]]:
+        """
+        Set of occupied coordinates on the board, the walls included,
+        computed on every access.
+        """
+        return self.get_occupied_coords_set()
+
     def get_occupied_coords_set(self) -> Set[Tuple[int, int]]:
         """
-        Computes the set of all occupied coordinates on the board.
+        Computes the set of all occupied coordinates on the board, the walls
+        included, so no vehicle moves into them.
 
         Returns:
         -----------------------------------------------------------------------
-            Set[Tuple[int, int]]: A set of all coordinates occupied by vehicles.
+            Set[Tuple[int, int]]: A set of all coordinates occupied by vehicles
+            or walls.
         """
         # map all the vehicles in self.vehicles to get_vehicle_coords
-        return set().union(*map(self.get_vehicle_coords, self.vehicles))
+        return set(self.topology.walls).union(*map(self.get_vehicle_coords,\
+                                                   self.vehicles))
     
     def __eq__(self, other: 'RushHour') -> bool:
         """
@@ -86,7 +130,7 @@ class RushHour(object):
         """
         if not isinstance(other, RushHour):
             return False
-        return self.vehicles == other.vehicles
+        return self.positions == other.positions
 
     def __ne__(self, other: 'RushHour') -> bool:
         """
@@ -104,13 +148,15 @@ class RushHour(object):
 
     def __hash__(self) -> int:
         """
-        Creates a hash for the board state based on vehicle position and id.
+        Creates a hash for the board state based on vehicle positions,
+        computed once.
 
         Returns:
             int: The hash value of the board state.
         """
-        board_str = ''.join(f'{v.id}{v.x}{v.y}' for v in self.vehicles)
-        return hash(board_str)
+        if self._hash is None:
+            self._hash = hash(self.positions)
+        return self._hash
 
     def __repr__(self) -> str:
         """
@@ -128,8 +174,8 @@ class RushHour(object):
     
     def get_board(self):
         """
-        Generates a 2D list representation of the board with empty tiles and
-        vehicle ids.
+        Generates a 2D list representation of the board with empty tiles,
+        walls as 'x' and vehicle ids.
 
         Returns:
         -----------------------------------------------------------------------
@@ -137,6 +183,8 @@ class RushHour(object):
         """
         # start with an empty board
         board = [[' ' for _ in range(self.dim_board)] for _ in range(self.dim_board)]
+        for x, y in self.topology.walls:
+            board[y][x] = 'x'
         # add the id of the vehicles to the board on the corresponding tiles
         for vehicle in self.vehicles:
             for i in range(vehicle.length):
@@ -145,6 +193,50 @@ class RushHour(object):
                 board[coord[1]][coord[0]] = vehicle.id
         return board
     
+    def at_positions(self, positions: Tuple[int, ...]) -> 'RushHour':
+        """
+        Creates a state of the same board with the vehicles at other positions
+        along their lanes.
+
+        Args:
+        -----------------------------------------------------------------------
+            positions (Tuple[int, ...]): Free coordinate of every vehicle, in
+            topology order.
+
+        Returns:
+        -----------------------------------------------------------------------
+            RushHour: The new state, without parent.
+        """
+        return RushHour(None, self.dim_board, topology=self.topology,\
+                        positions=positions)
+
+    @property
+    def vehicles(self) -> List[VehicleView]:
+        """
+        Sorted list of the vehicles on the board, as views shared by all
+        states of the board.
+        """
+        views = self.topology.views
+        return [views[i][p] for i, p in enumerate(self.positions)]
+
+    @property
+    def red_car(self) -> VehicleView:
+        """
+        The red car in the game, looked up by its index in the topology.
+        """
+        index = self.topology.red_index
+        return self.topology.views[index][self.positions[index]]
+
+    @property
+    def blockers(self) -> List[Vehicle]:
+        """
+        Vehicles blocking the red car's path to the exit, computed on first
+        access.
+        """
+        if self._blockers is None:
+            self._blockers = self.get_cars_blocking_red()
+        return self._blockers
+
     def get_red_car(self) -> Optional[Vehicle]:
         """
         Get the red car from the dictionary of vehicles in a state.
@@ -154,32 +246,48 @@ class RushHour(object):
             Optional[Vehicle]: The red car Vehicle object if found,
             None otherwise.
         """
-        for vehicle in self.vehicles:
-            if vehicle.id == 'X':
-                red_car = vehicle
-                return red_car
-        # return None if red car not found
-        return None
+        return self.red_car
     
     def get_cars_blocking_red(self) -> List[Vehicle]:
         """
-        Get the cars blocking the 'X' car (red car).
+        Get the cars blocking the 'X' car (red car). A child state only
+        differs from its parent in the moved vehicle, so unless the red car
+        moved, the parent's blockers are reused if it already computed them.
 
         Returns:
         -----------------------------------------------------------------------
             List[Vehicle]: A list of vehicles that are blocking the red car.
         """
-        # get teh red car
-        red_car = self.red_car
-        blocking_cars = []
+        parent = self.parent
+        if parent is not None and self.moved is not None and\
+                parent._blockers is not None and\
+                self.moved != self.topology.red_index:
+            moved_vehicle = self.topology.vehicle(self.moved, self.positions[self.moved])
+            blocking_cars = [v for v in parent.blockers if v.id != moved_vehicle.id]
+            if self.is_blocking_red(moved_vehicle):
+                insort(blocking_cars, moved_vehicle)
+            return blocking_cars
         # iterate through vehicle set and add blocking vehicles to the list
-        for v in self.vehicles:
-            # horizontal cars can not block the red car
-            if v.x > red_car.x + 1 and v.orientation == 'V':
-                if v.y == red_car.y - 1 or v.y == red_car.y or\
-                        (v.y == red_car.y - 2 and v.length == 3):
-                    blocking_cars.append(v)
-        return blocking_cars
+        return [v for v in self.vehicles if self.is_blocking_red(v)]
+
+    def is_blocking_red(self, v: Vehicle) -> bool:
+        """
+        Checks if a vehicle blocks the path of the red car to the exit.
+
+        Args:
+        -----------------------------------------------------------------------
+            v (Vehicle): The vehicle to check.
+
+        Returns:
+        -----------------------------------------------------------------------
+            bool: True if the vehicle is blocking the red car, False otherwise.
+        """
+        red_car = self.red_car
+        # horizontal cars can not block the red car
+        if v.x > red_car.x + 1 and v.orientation == 'V':
+            return v.y == red_car.y - 1 or v.y == red_car.y or\
+                    (v.y == red_car.y - 2 and v.length == 3)
+        return False
 
     def moves(self) -> Iterable['RushHour']:
         """
@@ -190,31 +298,40 @@ class RushHour(object):
             Iterable[RushHour]: An iterable of RushHour instances representing 
             new states after the possible moves.
         """
-        for v in self.vehicles:
-            # horziontal moves
-            if v.orientation == 'H':
-                # check if tile next to vehicle is free
-                if self.is_valid_move(v, 'left'):
-                    # create new vehicle with new coordinates
-                    new_v = Vehicle(v.id, v.orientation, v.x - 1, v.y, v.length)
-                    new_coords = (v.x - 1, v.y)
-                    # yield the new state of the game with updated vehicle position
-                    yield from self.perform_move(v, new_v, (v.x + v.length - 1, v.y), new_coords)
-                if self.is_valid_move(v, 'right'):
-                    new_v = Vehicle(v.id, v.orientation, v.x + 1, v.y, v.length)
-                    new_coords = (v.x + v.length, v.y)
-                    yield from self.perform_move(v, new_v, (v.x, v.y), new_coords)
-            # vertical moves
-            else: 
-                if self.is_valid_move(v, 'down'):
-                    new_v = Vehicle(v.id, v.orientation, v.x, v.y - 1, v.length)
-                    new_coords = (v.x, v.y - 1)
-                    yield from self.perform_move(v, new_v, (v.x, v.y + v.length - 1), new_coords)
-                if self.is_valid_move(v, 'up'):
-                    new_v = Vehicle(v.id, v.orientation, v.x, v.y + 1, v.length)
-                    new_coords = (v.x, v.y + v.length)
-                    yield from self.perform_move(v, new_v, (v.x, v.y), new_coords)
-    
+        topology = self.topology
+        occupied = self.occupied
+        for i, position in enumerate(self.positions):
+            # look up the moves of the vehicle from its current position
+            for new_position, free_bit, _ in topology.bit_move_table[i][position]:
+                if not occupied & free_bit:
+                    # get the vehicle with new coordinates and yield the
+                    # new state of the game with updated vehicle position
+                    v = topology.vehicle(i, position)
+                    new_v = topology.vehicle(i, new_position)
+                    yield from self.perform_move(v, new_v, i)
+
+    def slide_moves(self) -> Iterable['RushHour']:
+        """
+        Generates the next states reached by sliding a single vehicle any
+        number of free cells, so every slide counts as one move.
+
+        Returns:
+        -----------------------------------------------------------------------
+            Iterable[RushHour]: An iterable of RushHour instances representing 
+            new states after the possible slides.
+        """
+        topology = self.topology
+        occupied = self.occupied
+        for i, position in enumerate(self.positions):
+            for direction in topology.bit_slide_table[i][position]:
+                for new_position, free_bit, _ in direction:
+                    # the vehicle can not slide past an occupied tile
+                    if occupied & free_bit:
+                        break
+                    v = topology.vehicle(i, position)
+                    new_v = topology.vehicle(i, new_position)
+                    yield from self.perform_slide(v, new_v, i)
+
     def is_valid_move(self, v: Vehicle, direction: str) -> bool:
         """
         Checks if a move for a given vehicle in a specified direction is valid.
@@ -242,8 +359,8 @@ class RushHour(object):
             if direction == 'down':
                 return v.y - 1 >= 0 and (v.x, v.y - 1) not in self.occupied_coords
 
-    def perform_move(self, v: Vehicle, new_v: Vehicle, old_coords: Tuple[int, int],\
-                    new_coords: Tuple[int, int]) -> Iterable['RushHour']:
+    def perform_move(self, v: Vehicle, new_v: Vehicle, moved: int = None)\
+                                                -> Iterable['RushHour']:
         """
         Performs a move by updating the vehicle's position and yields new Rush
         Hour states.
@@ -252,28 +369,61 @@ class RushHour(object):
         -----------------------------------------------------------------------
             v (Vehicle): The vehicle to be moved.
             new_v (Vehicle): New vehicle with updated coordinates.
-            old_coords (Tuple[int, int]): Old coordinates of the vehicle.
-            new_coords (Tuple[int, int]): New coordinates of the vehicle.
+            moved (Optional[int]): Index of the vehicle in the vehicle list.
 
         Yields:
         -----------------------------------------------------------------------
             Iterable[RushHour]: New game states resulting from the move.
         """
-        # copy existing vehicles set
-        new_vehicles = self.vehicles.copy()
-        # remove vehicle to be moved and add back with updated coordinates
-        new_vehicles.remove(v)
-        # new_vehicles.add(new_v)
-        insort(new_vehicles, new_v)
-        # copy and update the set of te occupied coordinates
-        new_occupied_coords = self.occupied_coords.copy()
-        new_occupied_coords.remove(old_coords)
-        new_occupied_coords.add(new_coords)
-        # yield the new state
-        yield RushHour(new_vehicles, self.dim_board, parent=self, occupied_coords=new_occupied_coords)
-
-    def generate_future_states(self, current_state: 'RushHour', depth=3)\
-                                                        -> List['RushHour']:
+        if moved is None:
+            moved = self.topology.ids.index(v.id)
+        new_positions = self.moved_positions(v, new_v, moved)
+        # yield the new state, its occupancy follows from the positions
+        yield RushHour(None, self.dim_board, parent=self,\
+                topology=self.topology, moved=moved, positions=new_positions)
+
+    def perform_slide(self, v: Vehicle, new_v: Vehicle, moved: int = None)\
+                                                -> Iterable['RushHour']:
+        """
+        Performs a slide of a vehicle over one or more tiles and yields the
+        new Rush Hour state.
+
+        Args:
+        -----------------------------------------------------------------------
+            v (Vehicle): The vehicle to be moved.
+            new_v (Vehicle): New vehicle with updated coordinates.
+            moved (Optional[int]): Index of the vehicle in the vehicle list.
+
+        Yields:
+        -----------------------------------------------------------------------
+            Iterable[RushHour]: New game states resulting from the slide.
+        """
+        if moved is None:
+            moved = self.topology.ids.index(v.id)
+        new_positions = self.moved_positions(v, new_v, moved)
+        yield RushHour(None, self.dim_board, parent=self,\
+                topology=self.topology, moved=moved, positions=new_positions)
+
+    def moved_positions(self, v: Vehicle, new_v: Vehicle, moved: int)\
+                                                        -> Tuple[int, ...]:
+        """
+        Gets the positions of the vehicles after moving a single vehicle.
+
+        Args:
+        -----------------------------------------------------------------------
+            v (Vehicle): The vehicle to be moved.
+            new_v (Vehicle): New vehicle with updated coordinates.
+            moved (int): Index of the vehicle in the vehicle list.
+
+        Returns:
+        -----------------------------------------------------------------------
+            Tuple[int, ...]: The new free coordinate of every vehicle.
+        """
+        new_position = new_v.x if new_v.orientation == 'H' else new_v.y
+        return self.positions[:moved] + (new_position,) + self.positions[moved + 1:]
+
+    def generate_future_states(self, current_state: 'RushHour', depth=3,\
+                                        slide: bool =False) -> List['RushHour']:
         """
         Generates future states from the current state up to a specified depth.
 
@@ -281,6 +431,7 @@ class RushHour(object):
         -----------------------------------------------------------------------
             current_state (RushHour): The current state.
             depth (int): The depth for lookahead from the current state.
+            slide (bool): Generate multi-cell slides instead of single steps.
 
         Returns:
         -----------------------------------------------------------------------
@@ -292,8 +443,9 @@ class RushHour(object):
         # generate every future state from current state and add to a list
         # up to a certain depth
         future_states = []
-        for next_state in current_state.moves():
-            future_states.extend(self.generate_future_states(next_state, depth - 1))
+        next_states = current_state.slide_moves() if slide else current_state.moves()
+        for next_state in next_states:
+            future_states.extend(self.generate_future_states(next_state, depth - 1, slide))
         return future_states
     
     def is_solved(self) -> bool:
@@ -305,11 +457,9 @@ class RushHour(object):
         -----------------------------------------------------------------------
             bool: True if the puzzle is solved, False otherwise.
         """
-        for vehicle in self.vehicles:
-            if vehicle.id == 'X':
-                # check if red car is at the exit
-                return vehicle.x + vehicle.length == self.dim_board
-        return False
+        # check if red car is at the exit
+        red_car = self.red_car
+        return red_car.x + red_car.length == self.dim_board
     
     def is_solvable(self) -> bool:
         """
@@ -322,6 +472,7 @@ class RushHour(object):
         """
         exit_row = self.red_car.y
         if not self.blockers: return True
+        occupied_coords = self.occupied_coords
         # for 9x9 and 12x12 boards
         # check if the blocking car is in a position it can move out of, to 
         # free the exit without having to move other vehicles
@@ -352,8 +503,8 @@ class RushHour(object):
                         coords_up = {(blocker.x, blocker.y - i) for i in range(1,3)}
                         coords_down = {(blocker.x, blocker.y + 2)}
 
-                if (coords_up.intersection(self.occupied_coords)) or\
-                (coords_down.intersection(self.occupied_coords)): 
+                if (coords_up.intersection(occupied_coords)) or\
+                (coords_down.intersection(occupied_coords)): 
                     return False
             return True
         
@@ -361,9 +512,9 @@ class RushHour(object):
         if self.dim_board == 6 and self.blockers[0].x == 5:
             blocker = self.blockers[0]
             if blocker.y == 0:
-                return not ({(5, 3), (5, 4), (5,5)}.intersection(self.occupied_coords))
+                return not ({(5, 3), (5, 4), (5,5)}.intersection(occupied_coords))
             if blocker.y == 1:
-                return not ({(5, 4), (5, 5)}.intersection(self.occupied_coords))
+                return not ({(5, 4), (5, 5)}.intersection(occupied_coords))
             if blocker.y == 2:
-                return not ({(5,5)}.intersection(self.occupied_coords))
+                return not ({(5,5)}.intersection(occupied_coords))
             
@@ -0,0 +1,168 @@
+import os
+import json
+import sqlite3
+import hashlib
+from typing import Dict, List, Optional, Tuple
+from Code.classes.RushClass import RushHour
+from Code.classes.StateCodecClass import StateCodec
+
+class SolutionCache(object):
+    """
+    Solutions of previous solves, stored in an SQLite database on disk so
+    they are shared between runs and worker processes. A solution is keyed
+    by a canonical encoding of its start state and the settings of the
+    search, and is stored as the sequence of moves from the start state.
+
+    Attributes:
+    ---------------------------------------------------------------------------
+        path (str): Path to the database file.
+    """
+    # one open cache per path and process, as connections can not be shared
+    # with forked worker processes
+    _shared = {}
+
+    def __init__(self, path: str):
+        """
+        Opens the cache, creating the database if it does not exist.
+
+        Args:
+        -----------------------------------------------------------------------
+            path (str): Path to the database file.
+        """
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.connection = sqlite3.connect(path, timeout=30)
+        # readers do not block the worker that is writing
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS solutions ("
+            "board TEXT, settings TEXT, moves TEXT, algorithm TEXT,"
+            "steps INTEGER, move_count INTEGER, visited INTEGER, time REAL,"
+            "PRIMARY KEY (board, settings))")
+        self.connection.commit()
+
+    @classmethod
+    def shared(cls, path: str) -> 'SolutionCache':
+        """
+        Gets the open cache of this process for a path, opening it on first
+        use.
+
+        Args:
+        -----------------------------------------------------------------------
+            path (str): Path to the database file.
+
+        Returns:
+        -----------------------------------------------------------------------
+            SolutionCache: The cache.
+        """
+        key = (path, os.getpid())
+        if key not in cls._shared:
+            cls._shared[key] = cls(path)
+        return cls._shared[key]
+
+    @staticmethod
+    def board_key(rush_game: RushHour) -> str:
+        """
+        Encodes a board as a string that only depends on its vehicles, unlike
+        the hash of the state, which is salted per process.
+
+        Args:
+        -----------------------------------------------------------------------
+            rush_game (RushHour): The board.
+
+        Returns:
+        -----------------------------------------------------------------------
+            str: The SHA-256 digest of the canonical encoding of the board
+            and the state.
+        """
+        codec = StateCodec(rush_game.topology)
+        return hashlib.sha256(codec.board_bytes + codec.to_bytes(rush_game)).hexdigest()
+
+    @staticmethod
+    def settings_key(algorithm: str, settings: Dict[str, any]) -> str:
+        """
+        Encodes the algorithm and the settings of a search that change its
+        solution.
+
+        Args:
+        -----------------------------------------------------------------------
+            algorithm (str): The algorithm of the search.
+            settings (Dict[str, any]): The settings of the search.
+
+        Returns:
+        -----------------------------------------------------------------------
+            str: The settings as JSON with sorted keys.
+        """
+        return json.dumps(dict(settings, algorithm=algorithm.lower()),\
+                                                            sort_keys=True)
+
+    def get(self, rush_game: RushHour, algorithm: str, settings: Dict[str, any])\
+                                -> Optional[Tuple[List[RushHour], int, int]]:
+        """
+        Looks up the solution of a board and replays its moves.
+
+        Args:
+        -----------------------------------------------------------------------
+            rush_game (RushHour): The start state.
+            algorithm (str): The algorithm of the search.
+            settings (Dict[str, any]): The settings of the search.
+
+        Returns:
+        -----------------------------------------------------------------------
+            Optional[Tuple[List[RushHour], int, int]]: The solution path, its
+            number of moves and the number of states visited by the search,
+            or None if the board is not in the cache.
+        """
+        row = self.connection.execute(
+            "SELECT moves, move_count, visited FROM solutions "
+            "WHERE board = ? AND settings = ?",
+            (self.board_key(rush_game), self.settings_key(algorithm, settings))
+        ).fetchone()
+        if row is None:
+            return None
+        moves, move_count, visited = row
+
+        solution = [rush_game]
+        positions = list(rush_game.positions)
+        for index, position in json.loads(moves):
+            positions[index] = position
+            solution.append(rush_game.at_positions(tuple(positions)))
+        return solution, move_count, visited
+
+    def put(self, rush_game: RushHour, algorithm: str, settings: Dict[str, any],\
+            solution: List[RushHour], stats: Dict[str, float]) -> None:
+        """
+        Stores the solution of a board as the vehicle and position of every
+        step.
+
+        Args:
+        -----------------------------------------------------------------------
+            rush_game (RushHour): The start state.
+            algorithm (str): The algorithm of the search.
+            settings (Dict[str, any]): The settings of the search.
+            solution (List[RushHour]): The solution path from the start state.
+            stats (Dict[str, float]): The steps, moves, visited states and
+                time of the search.
+        """
+        moves = []
+        for state, next_state in zip(solution, solution[1:]):
+            for index, (p, next_p) in enumerate(zip(state.positions,\
+                                                    next_state.positions)):
+                if p != next_p:
+                    moves.append((index, next_p))
+                    break
+        self.connection.execute(
+            "INSERT OR REPLACE INTO solutions VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (self.board_key(rush_game), self.settings_key(algorithm, settings),
+             json.dumps(moves), algorithm.lower(), stats["steps"],
+             stats["moves"], stats["visited"], stats["time"]))
+        self.connection.commit()
+
+    def close(self) -> None:
+        """
+        Closes the database.
+        """
+        self.connection.close()
+        SolutionCache._shared.pop((self.path, os.getpid()), None)
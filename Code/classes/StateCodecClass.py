@@ -0,0 +1,169 @@
+import struct
+import numpy as np
+from typing import Iterable, List, Tuple, Union
+from Code.classes.RushClass import RushHour
+from Code.classes.BitboardClass import BitboardRushHour
+from Code.classes.TopologyClass import BoardTopology
+
+class StateCodec(object):
+    """
+    Canonical binary encoding of the states of a board. The board is encoded
+    once as a fixed-width vehicle table, and a state as the positions of its
+    vehicles packed into an integer, with the first vehicle in the highest
+    bits, which takes a few bytes per state. The encoding only depends on
+    the vehicles, unlike the hash of a state, which is salted per process.
+
+    Attributes:
+    ---------------------------------------------------------------------------
+        topology (BoardTopology): The board of the states.
+        bits (Tuple[int, ...]): Bits of the position of every vehicle.
+        shifts (Tuple[int, ...]): Offset of the position of every vehicle.
+        width (int): Number of bytes of an encoded state.
+        board_bytes (bytes): The vehicle table of the board, followed by the
+            number and the cells of its walls if it has any.
+    """
+    # bytes of a vehicle id in the vehicle table
+    ID_WIDTH = 2
+    VEHICLE = struct.Struct(f'={ID_WIDTH}sBBB')
+
+    def __init__(self, topology: BoardTopology):
+        """
+        Creates the codec of a board.
+
+        Args:
+        -----------------------------------------------------------------------
+            topology (BoardTopology): The board.
+        """
+        self.topology = topology
+        self.bits = tuple((len(masks) - 1).bit_length() for masks in topology.masks)
+        total = sum(self.bits)
+        shifts = []
+        for b in self.bits:
+            total -= b
+            shifts.append(total)
+        self.shifts = tuple(shifts)
+        self.width = max(1, (sum(self.bits) + 7) // 8)
+
+        table = [bytes((topology.dim_board, len(topology.ids)))]
+        for id, orientation, lane, length in zip(topology.ids, topology.orientations,\
+                                                 topology.lanes, topology.lengths):
+            if len(id) > self.ID_WIDTH:
+                raise ValueError(f"Vehicle id {id} is longer than {self.ID_WIDTH} characters")
+            table.append(self.VEHICLE.pack(id.encode('ascii'), ord(orientation), lane, length))
+        # boards without walls keep the encoding they had before walls
+        if topology.walls:
+            table.append(bytes([len(topology.walls)]))
+            table.append(bytes(y * topology.dim_board + x for x, y in topology.walls))
+        self.board_bytes = b''.join(table)
+
+    def encode(self, state: Union[RushHour, BitboardRushHour, Tuple[int, ...]]) -> int:
+        """
+        Packs a state into an integer.
+
+        Args:
+        -----------------------------------------------------------------------
+            state (Union[RushHour, BitboardRushHour, Tuple[int, ...]]): The
+                state, or the positions of its vehicles.
+
+        Returns:
+        -----------------------------------------------------------------------
+            int: The packed state.
+        """
+        positions = state if isinstance(state, tuple) else state.positions
+        key = 0
+        for p, b in zip(positions, self.bits):
+            key = (key << b) | p
+        return key
+
+    def decode(self, key: int) -> Tuple[int, ...]:
+        """
+        Unpacks the positions of a state.
+
+        Args:
+        -----------------------------------------------------------------------
+            key (int): The packed state.
+
+        Returns:
+        -----------------------------------------------------------------------
+            Tuple[int, ...]: Free coordinate of every vehicle.
+        """
+        return tuple((key >> shift) & ((1 << b) - 1)\
+                     for shift, b in zip(self.shifts, self.bits))
+
+    def to_bytes(self, state: Union[RushHour, BitboardRushHour, Tuple[int, ...]]) -> bytes:
+        """
+        Encodes a state as width bytes.
+
+        Args:
+        -----------------------------------------------------------------------
+            state (Union[RushHour, BitboardRushHour, Tuple[int, ...]]): The
+                state, or the positions of its vehicles.
+
+        Returns:
+        -----------------------------------------------------------------------
+            bytes: The encoded state, big-endian.
+        """
+        return self.encode(state).to_bytes(self.width, 'big')
+
+    def from_bytes(self, data: bytes) -> Tuple[int, ...]:
+        """
+        Decodes the positions of a state encoded by to_bytes.
+
+        Args:
+        -----------------------------------------------------------------------
+            data (bytes): The encoded state.
+
+        Returns:
+        -----------------------------------------------------------------------
+            Tuple[int, ...]: Free coordinate of every vehicle.
+        """
+        return self.decode(int.from_bytes(data, 'big'))
+
+    def encode_batch(self, states: Iterable[Union[RushHour, BitboardRushHour,\
+                                                  Tuple[int, ...]]]) -> bytes:
+        """
+        Encodes many states into one buffer of width bytes per state. States
+        that fit in 64 bits are packed all at once with NumPy.
+
+        Args:
+        -----------------------------------------------------------------------
+            states (Iterable[Union[RushHour, BitboardRushHour, Tuple[int, ...]]]):
+                The states, or the positions of their vehicles.
+
+        Returns:
+        -----------------------------------------------------------------------
+            bytes: The encoded states, one after the other.
+        """
+        if self.width > 8:
+            return b''.join(self.to_bytes(state) for state in states)
+        positions = np.array([state if isinstance(state, tuple) else state.positions
+                              for state in states], dtype=np.uint64)
+        if not len(positions):
+            return b''
+        keys = (positions << np.array(self.shifts, dtype=np.uint64)).sum(axis=1,\
+                                                                dtype=np.uint64)
+        # big-endian, keeping the low width bytes of every key
+        return keys.astype('>u8').view(np.uint8).reshape(-1, 8)[:, 8 - self.width:].tobytes()
+
+    def decode_batch(self, buffer: bytes) -> List[Tuple[int, ...]]:
+        """
+        Decodes a buffer of encode_batch.
+
+        Args:
+        -----------------------------------------------------------------------
+            buffer (bytes): The encoded states.
+
+        Returns:
+        -----------------------------------------------------------------------
+            List[Tuple[int, ...]]: The positions of every state.
+        """
+        if self.width > 8:
+            return [self.from_bytes(buffer[i:i + self.width])\
+                    for i in range(0, len(buffer), self.width)]
+        data = np.frombuffer(buffer, dtype=np.uint8).reshape(-1, self.width)
+        padded = np.zeros((len(data), 8), dtype=np.uint8)
+        padded[:, 8 - self.width:] = data
+        keys = padded.view('>u8').reshape(-1).astype(np.uint64)
+        masks = np.array([(1 << b) - 1 for b in self.bits], dtype=np.uint64)
+        positions = (keys[:, None] >> np.array(self.shifts, dtype=np.uint64)) & masks
+        return [tuple(row) for row in positions.tolist()]
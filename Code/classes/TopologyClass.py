@@ -0,0 +1,152 @@
+from typing import Tuple, List, Iterable
+from Code.classes.VehicleClass import Vehicle, VehicleView
+
+class BoardTopology(object):
+    """
+    Static description of a loaded board, computed once and shared by every
+    state of that board. Vehicles never leave their row or column, so only
+    the free coordinate of a vehicle changes between states, and the moves
+    from every position along a lane can be tabulated up front.
+
+    Attributes:
+    ---------------------------------------------------------------------------
+        dim_board (int): Dimension of the board (6, 9, or 12).
+        ids (Tuple[str, ...]): Vehicle ids, sorted alphabetically.
+        orientations (Tuple[str, ...]): Orientation per vehicle ('H' or 'V').
+        lengths (Tuple[int, ...]): Length per vehicle.
+        lanes (Tuple[int, ...]): The fixed row (for 'H') or column (for 'V')
+        of every vehicle.
+        red_index (int): Index of the red car ('X') in the vehicle tuples.
+        walls (Tuple[Tuple[int, int], ...]): The (x, y) coordinates of the
+        fixed wall cells, sorted, which are occupied in every state.
+        wall_bits (int): Bitboard of the wall cells.
+        cell_bits (Tuple[Tuple[int, ...], ...]): Per vehicle, the bit of the
+        cell at every coordinate along its lane.
+        masks (Tuple[Tuple[int, ...], ...]): Per vehicle, the occupancy mask
+        of the vehicle at every valid position along its lane.
+        bit_move_table (Tuple[Tuple[Tuple, ...], ...]): Per vehicle and
+        position, the single-cell moves as (new position, bit that must be
+        free, mask toggling the old and new cells).
+        bit_slide_table (Tuple[Tuple[Tuple, ...], ...]): Per vehicle and
+        position, the multi-cell slides backward and forward, ordered by
+        distance, as (new position, furthest bit that must be free, mask
+        toggling the old and new cells).
+        views (Tuple[Tuple[VehicleView, ...], ...]): Per vehicle and position,
+        the shared view of the vehicle at that position.
+    """
+
+    def __init__(self, vehicles: List[Vehicle], dimension: int,\
+                                    walls: Iterable[Tuple[int, int]] =()):
+        """
+        Builds the topology from the vehicles of an initial board.
+
+        Args:
+        -----------------------------------------------------------------------
+            vehicles (List[Vehicle]): The vehicles of the initial board.
+            dimension (int): The dimension of the board.
+            walls (Iterable[Tuple[int, int]]): The (x, y) coordinates of the
+            wall cells, none by default.
+        """
+        vehicles = sorted(vehicles, key=lambda v: v.id)
+        self.dim_board = dimension
+        self.ids = tuple(v.id for v in vehicles)
+        self.orientations = tuple(v.orientation for v in vehicles)
+        self.lengths = tuple(v.length for v in vehicles)
+        self.lanes = tuple(v.y if v.orientation == 'H' else v.x
+                           for v in vehicles)
+        self.red_index = self.ids.index('X')
+        self.walls = tuple(sorted(set(walls)))
+        self.wall_bits = sum(1 << (y * dimension + x) for x, y in self.walls)
+
+        cell_bits, masks, bit_move_table, bit_slide_table = [], [], [], []
+        for i in range(len(vehicles)):
+            cells = [self.cell(i, j) for j in range(dimension)]
+            bits = tuple(1 << (y * dimension + x) for x, y in cells)
+            length = self.lengths[i]
+            positions = range(dimension - length + 1)
+            cell_bits.append(bits)
+            masks.append(tuple(sum(bits[p:p + length]) for p in positions))
+
+            bit_moves = []
+            for p in positions:
+                # backward (left or down) first, then forward (right or up)
+                steps = []
+                if p > 0:
+                    steps.append((p - 1, p - 1, p + length - 1))
+                if p + length < dimension:
+                    steps.append((p + 1, p + length, p))
+                bit_moves.append(tuple((new_p, bits[free], bits[free] | bits[vacated])
+                                       for new_p, free, vacated in steps))
+            bit_move_table.append(tuple(bit_moves))
+
+            bit_slides = []
+            for p in positions:
+                # slides get longer as long as the next cell is free, so the
+                # lists only keep the one extra cell every slide needs
+                backward = [(new_p, new_p) for new_p in range(p - 1, -1, -1)]
+                forward = [(new_p, new_p + length - 1)
+                           for new_p in range(p + 1, dimension - length + 1)]
+                bit_directions = []
+                for direction in (backward, forward):
+                    bit_entries = []
+                    for new_p, free in direction:
+                        bit_entries.append((new_p, bits[free],
+                                            masks[-1][p] ^ masks[-1][new_p]))
+                    bit_directions.append(tuple(bit_entries))
+                bit_slides.append(tuple(bit_directions))
+            bit_slide_table.append(tuple(bit_slides))
+
+        self.cell_bits = tuple(cell_bits)
+        self.masks = tuple(masks)
+        self.bit_move_table = tuple(bit_move_table)
+        self.bit_slide_table = tuple(bit_slide_table)
+        self.views = tuple(tuple(VehicleView(self, i, p) for p in range(len(masks[i])))
+                           for i in range(len(vehicles)))
+
+    def cell(self, i: int, coordinate: int) -> Tuple[int, int]:
+        """
+        Gets the (x, y) coordinates of a cell along the lane of vehicle i.
+
+        Args:
+        -----------------------------------------------------------------------
+            i (int): Index of the vehicle in the topology.
+            coordinate (int): Coordinate along the lane.
+
+        Returns:
+        -----------------------------------------------------------------------
+            Tuple[int, int]: The cell on the board.
+        """
+        if self.orientations[i] == 'H':
+            return (coordinate, self.lanes[i])
+        return (self.lanes[i], coordinate)
+
+    def positions_of(self, vehicles: List[Vehicle]) -> Tuple[int, ...]:
+        """
+        Gets the free coordinate of every vehicle, in topology order.
+
+        Args:
+        -----------------------------------------------------------------------
+            vehicles (List[Vehicle]): Vehicles of a board with this topology.
+
+        Returns:
+        -----------------------------------------------------------------------
+            Tuple[int, ...]: The x-coordinate of horizontal vehicles and the
+            y-coordinate of vertical vehicles.
+        """
+        vehicles = sorted(vehicles, key=lambda v: v.id)
+        return tuple(v.x if v.orientation == 'H' else v.y for v in vehicles)
+
+    def vehicle(self, i: int, position: int) -> VehicleView:
+        """
+        Gets the shared view of vehicle i at the given position.
+
+        Args:
+        -----------------------------------------------------------------------
+            i (int): Index of the vehicle in the topology.
+            position (int): Free coordinate of the vehicle.
+
+        Returns:
+        -----------------------------------------------------------------------
+            VehicleView: The vehicle with its board coordinates.
+        """
+        return self.views[i][position]
@@ -1,3 +1,8 @@
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from Code.classes.TopologyClass import BoardTopology
+
 class Vehicle(object):
     """
     Represents a single vehicle in the Rush Hour game, including position, 
@@ -11,6 +16,8 @@ class Vehicle(object):
         y (int): The y-coordinate of the vehicle on the board.
         length (int): The length of the vehicle.
     """
+    __slots__ = ('id', 'orientation', 'x', 'y', 'length')
+
     def __init__(self, id: str, orientation: str, x: int, y: int, length: int):
         """
         Initializes a Vehicle with specified properties.
@@ -47,9 +54,10 @@ class Vehicle(object):
         Returns:
             bool: True if both vehicles have the same properties, False otherwise.
         """
-        if not isinstance(other, Vehicle):
+        if not isinstance(other, (Vehicle, VehicleView)):
             return False
-        return self.__dict__ == other.__dict__
+        return (self.id, self.orientation, self.x, self.y, self.length) ==\
+            (other.id, other.orientation, other.x, other.y, other.length)
 
     def __ne__(self, other: 'Vehicle') -> bool:
         """
@@ -83,4 +91,135 @@ class Vehicle(object):
         Returns:
             str: The string representation.
         """
-        return f"Vehicle({self.id}, {self.orientation}, {self.x}, {self.y}, {self.length})"
\ No newline at end of file
+        return f"Vehicle({self.id}, {self.orientation}, {self.x}, {self.y}, {self.length})"
+
+
+class VehicleView(object):
+    """
+    Read-only view of a vehicle of a board at one position along its lane.
+    The id, orientation and length are looked up in the topology of the
+    board, which stores them once, so a view only holds its index and
+    position. The topology creates one view per vehicle and position, which
+    all states of the board share.
+
+    Attributes:
+        topology (BoardTopology): Static description of the board.
+        index (int): Index of the vehicle in the topology.
+        position (int): Free coordinate of the vehicle along its lane.
+    """
+    __slots__ = ('topology', 'index', 'position')
+
+    def __init__(self, topology: 'BoardTopology', index: int, position: int):
+        """
+        Initializes a view of a vehicle.
+
+        Args:
+            topology (BoardTopology): Static description of the board.
+            index (int): Index of the vehicle in the topology.
+            position (int): Free coordinate of the vehicle along its lane.
+        """
+        self.topology = topology
+        self.index = index
+        self.position = position
+
+    @property
+    def id(self) -> str:
+        """
+        The identifier of the vehicle.
+        """
+        return self.topology.ids[self.index]
+
+    @property
+    def orientation(self) -> str:
+        """
+        The orientation of the vehicle ('H' or 'V').
+        """
+        return self.topology.orientations[self.index]
+
+    @property
+    def length(self) -> int:
+        """
+        The length of the vehicle.
+        """
+        return self.topology.lengths[self.index]
+
+    @property
+    def x(self) -> int:
+        """
+        The x-coordinate of the vehicle on the board.
+        """
+        if self.topology.orientations[self.index] == 'H':
+            return self.position
+        return self.topology.lanes[self.index]
+
+    @property
+    def y(self) -> int:
+        """
+        The y-coordinate of the vehicle on the board.
+        """
+        if self.topology.orientations[self.index] == 'H':
+            return self.topology.lanes[self.index]
+        return self.position
+
+    def __hash__(self) -> int:
+        """
+        Generates a hash value for the vehicle, equal to the hash of the
+        Vehicle with the same properties.
+
+        Returns:
+            int: The hash value.
+        """
+        return hash((self.id, self.orientation, self.x, self.y, self.length))
+
+    def __eq__(self, other: 'VehicleView') -> bool:
+        """
+        Checks if this vehicle is equal to another vehicle or view.
+
+        Args:
+            other (VehicleView): The vehicle to compare with.
+
+        Returns:
+            bool: True if both vehicles have the same properties, False otherwise.
+        """
+        if self is other:
+            return True
+        if isinstance(other, VehicleView) and other.topology is self.topology:
+            return self.index == other.index and self.position == other.position
+        if not isinstance(other, (Vehicle, VehicleView)):
+            return False
+        return (self.id, self.orientation, self.x, self.y, self.length) ==\
+            (other.id, other.orientation, other.x, other.y, other.length)
+
+    def __ne__(self, other: 'VehicleView') -> bool:
+        """
+        Checks if this vehicle is not equal to another vehicle or view.
+
+        Args:
+            other (VehicleView): The vehicle to compare with.
+
+        Returns:
+            bool: True if vehicles have different properties, False otherwise.
+        """
+        return not self.__eq__(other)
+
+    def __lt__(self, other: 'VehicleView') -> bool:
+        """
+        Compares this vehicle with another by the alphabetic order of their id.
+
+        Args:
+            other (VehicleView): The vehicle to compare with.
+
+        Returns:
+            bool: True if this vehicle's id is less than the other vehicle's id,
+            alphabetically.
+        """
+        return self.id < other.id
+
+    def __repr__(self) -> str:
+        """
+        Gives a string representation of the vehicle.
+
+        Returns:
+            str: The string representation.
+        """
+        return f"Vehicle({self.id}, {self.orientation}, {self.x}, {self.y}, {self.length})"
@@ -0,0 +1,280 @@
+import os
+import shutil
+import tempfile
+import numpy as np
+from typing import Iterable, Iterator, List, Optional
+
+class VisitedSet(object):
+    """
+    Set of encoded states with a bounded number of states in memory. When
+    the memory budget is reached the states in memory are sorted and
+    spilled to a run on disk. Membership of a single state checks memory and
+    then every run with a binary search, and a batch of states can be
+    checked against the runs at once, so searches can detect duplicates
+    against the disk in a delayed pass instead of on every state. Runs are
+    read in blocks, so merging and filtering them only holds a block per
+    run in memory.
+
+    States are added in generations, such as the depth levels of a
+    breadth-first search. A spill writes the states of the current
+    generation to their own run, so a delayed check of a generation only
+    compares against the states of earlier generations.
+
+    Attributes:
+    ---------------------------------------------------------------------------
+        width (int): Number of bytes of an encoded state.
+        memory_limit (int): Maximum number of states kept in memory.
+        directory (str): Directory of the runs.
+        runs (List[np.ndarray]): Sorted spilled states, memory-mapped.
+        generation (int): The generation of the states being added.
+    """
+    # number of states read from a run at a time
+    BLOCK = 65536
+
+    def __init__(self, width: int, memory_limit: int =1000000,\
+                                    directory: Optional[str] =None):
+        """
+        Creates an empty set.
+
+        Args:
+        -----------------------------------------------------------------------
+            width (int): Number of bytes of an encoded state.
+            memory_limit (int): Maximum number of states kept in memory.
+            directory (Optional[str]): Directory to spill the runs to, a
+                temporary directory if None.
+        """
+        self.width = width
+        self.memory_limit = max(1, memory_limit)
+        self._owns_directory = directory is None
+        self.directory = tempfile.mkdtemp(prefix='visited-') if directory is None\
+                                                                else directory
+        os.makedirs(self.directory, exist_ok=True)
+        self.dtype = np.dtype(f'S{width}')
+        # generation of every state in memory
+        self.memory = {}
+        self.runs = []
+        self.generation = 0
+        # newest generation in every run
+        self._run_generations = []
+        self._run_number = 0
+        self._spilled = 0
+
+    def add(self, key: bytes, check_disk: bool =False) -> bool:
+        """
+        Adds a state, spilling the memory to disk if it is full.
+
+        Args:
+        -----------------------------------------------------------------------
+            key (bytes): The encoded state.
+            check_disk (bool): Also look the state up in the runs. Without
+                it, a state already spilled is only found by filter_spilled.
+
+        Returns:
+        -----------------------------------------------------------------------
+            bool: True if the state was not seen before.
+        """
+        if key in self.memory or (check_disk and self._on_disk(key)):
+            return False
+        self.memory[key] = self.generation
+        if len(self.memory) >= self.memory_limit:
+            self.spill()
+        return True
+
+    def __contains__(self, key: bytes) -> bool:
+        """
+        Checks if a state is in memory or in one of the runs.
+
+        Args:
+        -----------------------------------------------------------------------
+            key (bytes): The encoded state.
+
+        Returns:
+        -----------------------------------------------------------------------
+            bool: True if the state is in the set.
+        """
+        return key in self.memory or self._on_disk(key)
+
+    def _on_disk(self, key: bytes) -> bool:
+        """
+        Looks a state up in the runs with a binary search per run.
+
+        Args:
+        -----------------------------------------------------------------------
+            key (bytes): The encoded state.
+
+        Returns:
+        -----------------------------------------------------------------------
+            bool: True if the state is in a run.
+        """
+        value = np.array(key, dtype=self.dtype)
+        for run in self.runs:
+            index = int(np.searchsorted(run, value))
+            if index < len(run) and run[index] == value:
+                return True
+        return False
+
+    def next_generation(self) -> None:
+        """
+        Starts a new generation of states.
+        """
+        self.generation += 1
+
+    def spill(self) -> None:
+        """
+        Writes the states in memory to sorted runs on disk, one for the
+        current generation and one for the earlier ones, and empties the
+        memory.
+        """
+        older = [key for key, generation in self.memory.items()\
+                                    if generation < self.generation]
+        current = [key for key, generation in self.memory.items()\
+                                    if generation == self.generation]
+        self.memory = {}
+        for keys, generation in ((older, self.generation - 1),\
+                                 (current, self.generation)):
+            if keys:
+                self._spilled += len(keys)
+                self.runs.append(self.write_run([self.as_array(keys)]))
+                self._run_generations.append(generation)
+
+    def write_run(self, blocks: Iterable[np.ndarray]) -> np.ndarray:
+        """
+        Writes sorted states to a new file in the directory, block by block,
+        and maps them back from disk. The run is not added to the set.
+
+        Args:
+        -----------------------------------------------------------------------
+            blocks (Iterable[np.ndarray]): The sorted states, in blocks.
+
+        Returns:
+        -----------------------------------------------------------------------
+            np.ndarray: The states, memory-mapped unless there are none.
+        """
+        path = os.path.join(self.directory, f'run-{self._run_number}.bin')
+        self._run_number += 1
+        with open(path, 'wb') as file:
+            for keys in blocks:
+                file.write(keys.tobytes())
+        # an empty file can not be mapped
+        if not os.path.getsize(path):
+            os.remove(path)
+            return np.empty(0, dtype=self.dtype)
+        return np.memmap(path, dtype=self.dtype, mode='r')
+
+    @staticmethod
+    def delete_run(run: np.ndarray) -> None:
+        """
+        Deletes the file of a run written by write_run.
+
+        Args:
+        -----------------------------------------------------------------------
+            run (np.ndarray): The run.
+        """
+        if isinstance(run, np.memmap):
+            os.remove(run.filename)
+
+    def _remove_runs(self) -> None:
+        """
+        Deletes the run files.
+        """
+        for run in self.runs:
+            self.delete_run(run)
+        self.runs = []
+        self._run_generations = []
+
+    @classmethod
+    def merge(cls, runs: List[np.ndarray]) -> Iterator[np.ndarray]:
+        """
+        Merges sorted runs into sorted blocks of unique states, reading a
+        block of every run at a time. Every step takes the states up to the
+        smallest last state of the blocks, which are all the states up to it
+        in every run.
+
+        Args:
+        -----------------------------------------------------------------------
+            runs (List[np.ndarray]): Sorted runs of unique states.
+
+        Returns:
+        -----------------------------------------------------------------------
+            Iterator[np.ndarray]: The sorted unique states of all runs, in
+            increasing blocks.
+        """
+        cursors = [0] * len(runs)
+        while True:
+            blocks = [(i, run[cursors[i]:cursors[i] + cls.BLOCK])\
+                      for i, run in enumerate(runs)]
+            blocks = [(i, block) for i, block in blocks if len(block)]
+            if not blocks:
+                return
+            bound = min(block[-1] for _, block in blocks)
+            taken = []
+            for i, block in blocks:
+                count = int(np.searchsorted(block, bound, side='right'))
+                taken.append(block[:count])
+                cursors[i] += count
+            yield np.unique(np.concatenate(taken))
+
+    def filter_spilled(self, blocks: Iterable[np.ndarray]) -> Iterator[np.ndarray]:
+        """
+        Delayed duplicate detection: drops the states found in the runs of
+        earlier generations. Only the part of a run in the range of a block
+        is read, a block of the run at a time.
+
+        Args:
+        -----------------------------------------------------------------------
+            blocks (Iterable[np.ndarray]): Sorted unique encoded states, in
+                increasing blocks.
+
+        Returns:
+        -----------------------------------------------------------------------
+            Iterator[np.ndarray]: The blocks without the states that were
+            seen in earlier generations.
+        """
+        runs = [run for run, generation in zip(self.runs, self._run_generations)\
+                if generation < self.generation]
+        for keys in blocks:
+            for run in runs:
+                if not len(keys):
+                    break
+                first = int(np.searchsorted(run, keys[0]))
+                last = int(np.searchsorted(run, keys[-1], side='right'))
+                for start in range(first, last, self.BLOCK):
+                    part = run[start:min(start + self.BLOCK, last)]
+                    keys = keys[~np.isin(keys, part, assume_unique=True)]
+            if len(keys):
+                yield keys
+
+    def __len__(self) -> int:
+        """
+        Gets the number of states added, counting states spilled more than
+        once, which only happens for states added without check_disk.
+
+        Returns:
+        -----------------------------------------------------------------------
+            int: The number of states.
+        """
+        return len(self.memory) + self._spilled
+
+    def as_array(self, keys: Iterable[bytes]) -> np.ndarray:
+        """
+        Converts encoded states to a sorted array without duplicates, the
+        format of the runs.
+
+        Args:
+        -----------------------------------------------------------------------
+            keys (Iterable[bytes]): The encoded states.
+
+        Returns:
+        -----------------------------------------------------------------------
+            np.ndarray: The sorted unique states.
+        """
+        return np.unique(np.frombuffer(b''.join(keys), dtype=self.dtype))
+
+    def close(self) -> None:
+        """
+        Deletes the runs, and the directory if it was created by the set.
+        """
+        self._remove_runs()
+        self.memory = {}
+        if self._owns_directory:
+            shutil.rmtree(self.directory, ignore_errors=True)
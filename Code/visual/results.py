@@ -25,7 +25,7 @@ def desc_stats(stats, unsolved_count, algo, save_to_file=False):
     Args:
     ---------------------------------------------------------------------------
         stats (Dict[str, List[Union[float, int]]]): A dictionary containing 
-            'times', 'steps', and 'visited' data.
+            'times', 'steps', 'moves' and 'visited' data.
         unsolved_count (int): The number of puzzles that were not solved.
         algo (str): The name of the algorithm used for the statistics.
         save_to_file (bool, optional): Flag to determine if the statistics
@@ -33,6 +33,7 @@ def desc_stats(stats, unsolved_count, algo, save_to_file=False):
     """
     times = stats['times']
     steps = stats['steps']
+    moves = stats.get('moves', [])
     visited = stats['visited']
     total_games = len(times)
     output = ""
@@ -62,6 +63,22 @@ def desc_stats(stats, unsolved_count, algo, save_to_file=False):
         output += f"Mean           : {format_stat(np.mean(steps))}\n"
         output += f"Min            : {format_stat(np.min(steps))}\n"
         output += f"Max            : {format_stat(np.max(steps))}\n"
+
+        # Moves statistics
+        if moves:
+            output += f"\nMoves Statistics:\n{'-' * 25}\n"
+            output += f"Total Moves    : {format_stat(sum(moves))}\n"
+            output += f"Mean           : {format_stat(np.mean(moves))}\n"
+            output += f"Min            : {format_stat(np.min(moves))}\n"
+            output += f"Max            : {format_stat(np.max(moves))}\n"
+
+        # Steps and moves of the solutions before post-processing
+        if stats.get('raw_steps'):
+            output += f"\nRaw Solution Statistics:\n{'-' * 25}\n"
+            output += f"Mean Steps     : {format_stat(np.mean(stats['raw_steps']))}\n"
+            output += f"Max Steps      : {format_stat(np.max(stats['raw_steps']))}\n"
+            output += f"Mean Moves     : {format_stat(np.mean(stats['raw_moves']))}\n"
+            output += f"Max Moves      : {format_stat(np.max(stats['raw_moves']))}\n"
         
         # Visited statistics
         output += f"\Visited states Statistics:\n{'-' * 36}\n"
@@ -77,6 +94,10 @@ def desc_stats(stats, unsolved_count, algo, save_to_file=False):
         output += f"Status         : {solved_status}\n"
         output += f"Time Taken (s) : {format_stat(times[0]) if times else 'N/A'}\n"
         output += f"Number of Steps: {format_stat(steps[0]) if steps else 'N/A'}\n"
+        output += f"Number of Moves: {format_stat(moves[0]) if moves else 'N/A'}\n"
+        if stats.get('raw_steps'):
+            output += f"Raw Steps      : {format_stat(stats['raw_steps'][0])}\n"
+            output += f"Raw Moves      : {format_stat(stats['raw_moves'][0])}\n"
         output += f"States visited : {format_stat(visited[0]) if visited else 'N/A'}\n"
 
     print(output)
@@ -124,4 +145,45 @@ def plot_steps_histogram(steps, algo, save_to_file=False):
         plt.close()
         print(f"Histogram saved as {file_name}")
     else:
-        plt.show()
\ No newline at end of file
+        plt.show()
+
+
+def desc_layers(depth_states, layer_times):
+    """
+    Print the number of states and the time of every depth layer of a
+    level-synchronous search, to show how the layers scale.
+
+    Args:
+    ---------------------------------------------------------------------------
+        depth_states (Dict[int, int]): The number of new states per depth.
+        layer_times (Dict[int, float]): The time spent per depth in seconds.
+    """
+    output = f"\nLayer Statistics:\n{'-' * 36}\n"
+    output += f"{'Depth':>6} {'States':>12} {'Time':>9} {'States/s':>12}\n"
+    for depth, states in depth_states.items():
+        layer_time = layer_times.get(depth, 0.0)
+        rate = states / layer_time if layer_time else 0.0
+        output += f"{depth:>6} {states:>12} {layer_time:>9.3f} {rate:>12.0f}\n"
+    print(output)
+
+def desc_verification(report):
+    """
+    Print the verification of the solutions of a batch against the optimal
+    number of moves of the puzzle database.
+
+    Args:
+    ---------------------------------------------------------------------------
+        report (Dict[str, any]): The summary of verification_report, with
+            the gap statistics and the mismatches.
+    """
+    output = f"\nVerification ({report['algorithm']}):\n{'-' * 25}\n"
+    output += f"Solves         : {report['solves']}\n"
+    output += f"Compared       : {report['compared']}\n"
+    output += f"Optimal        : {report['optimal']}\n"
+    if report['compared']:
+        output += f"Mean Gap       : {format_stat(report['mean_gap'])}\n"
+        output += f"Max Gap        : {format_stat(report['max_gap'])}\n"
+    output += f"Mismatches     : {report['mismatch_count']}\n"
+    for record in report['mismatches'][:10]:
+        output += f"  game {record['game']}: {'; '.join(record['problems'])}\n"
+    print(output)
@@ -70,6 +70,10 @@ class Visualizer:
                 rect = pygame.Rect(x * cell_size, y * cell_size, cell_size,\
                                    cell_size)
                 pygame.draw.rect(self.screen, (0, 0, 0), rect, 1)
+        # draw the walls as filled grey tiles
+        for x, y in rush_hour_state.topology.walls:
+            rect = pygame.Rect(x * cell_size, y * cell_size, cell_size, cell_size)
+            pygame.draw.rect(self.screen, (96, 96, 96), rect)
 
         # Draw vehicles
         for vehicle in rush_hour_state.vehicles:
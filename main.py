@@ -15,8 +15,27 @@ def parse_arguments() -> Namespace:
 
     # Define the arguments that the program requires
     parser.add_argument("file_type", help="Type of file (csv or txt)", type=str)
-    parser.add_argument("algorithm", help="Algorithm to use (Astar, IDDFS, BFS, Random)", type=str)
+    parser.add_argument("algorithm", help="Algorithm to use (Astar, IDAstar, IDDFS, BFS, BiBFS, ParBFS, Cluster, Random, MCTS, Beam)", type=str)
     parser.add_argument("--repeat", help="Number of times to repeat solving the same game", type=int, default=1)
+    parser.add_argument("--slide", help="Search with multi-cell slides, so solutions are optimal in moves instead of steps", action="store_true")
+    parser.add_argument("--engine", help="State representation to search with (object, bitboard, or numpy for BFS and Random)", type=str, default="object", choices=["object", "bitboard", "numpy"])
+    parser.add_argument("--astar_mode", help="Heuristic mode of Astar and IDAstar (fast, weighted or optimal)", type=str, default="fast", choices=["fast", "weighted", "optimal"])
+    parser.add_argument("--weight", help="Weight of the admissible heuristic in the weighted Astar mode", type=float, default=1.0)
+    parser.add_argument("--workers", help="Number of processes solving games in parallel, or sharing a single search for ParBFS", type=int, default=1)
+    parser.add_argument("--seed", help="Seed of the Random and MCTS algorithms and of --sample, to reproduce a batch", type=int)
+    parser.add_argument("--cache", help="Path of the solution cache, solved boards are looked up instead of searched (default .cache/solutions.sqlite, see --no_cache)", type=str, default=".cache/solutions.sqlite")
+    parser.add_argument("--cluster_dir", help="Directory of the distance tables of the Cluster algorithm", type=str, default=".cache/clusters")
+    parser.add_argument("--no_cache", help="Always search, bypassing the solution cache, e.g. for benchmarks, and do not keep the Cluster tables", action="store_true")
+    parser.add_argument("--memory_limit", help="Maximum number of visited states BFS keeps in memory, spilling the rest to disk", type=int)
+    parser.add_argument("--postprocess", help="Post-processing of the solutions: none, erase to remove their cycles, or shorten to also shorten them by local searches", type=str, default="none", choices=["none", "erase", "shorten"])
+    parser.add_argument("--shorten_depth", help="Maximum number of steps of a shortcut of --postprocess shorten", type=int, default=8)
+    parser.add_argument("--mcts_iterations", help="Maximum number of simulations of MCTS per solve, 50000 without --time_limit", type=int)
+    parser.add_argument("--time_limit", help="Maximum wall-clock time of MCTS per solve in seconds", type=float)
+    parser.add_argument("--mcts_evaluate", help="Score the MCTS rollouts that do not reach the exit with the Astar heuristic", action="store_true")
+    parser.add_argument("--beam_width", help="Number of states Beam keeps per depth", type=int, default=100)
+    parser.add_argument("--beam_restarts", help="Maximum number of times Beam starts over with a twice as wide beam when it fails", type=int, default=0)
+    parser.add_argument("--verify", help="Replay every solution and compare it to the optimal number of moves of the database", action="store_true")
+    parser.add_argument("--report", help="Path of the JSON report of --verify", type=str, default="verification_report.json")
 
     # Arguments specific to CSV input files
     parser.add_argument("--dimension", help="Dimension of the board (6, 9, or 12)", type=int)
@@ -26,9 +45,18 @@ def parse_arguments() -> Namespace:
     parser.add_argument("--single_game", help="Single game number to solve", type=int)
     parser.add_argument("--game_range", help="Range of games to solve, e.g., '0-2'", type=str)
     parser.add_argument("--all_games", help="Solve all games", action="store_true")
+    parser.add_argument("--min_moves", help="Only solve games with at least this optimal number of moves", type=int)
+    parser.add_argument("--max_moves", help="Only solve games with at most this optimal number of moves", type=int)
+    parser.add_argument("--min_cluster", help="Only solve games with at least this many configurations in their cluster", type=int)
+    parser.add_argument("--max_cluster", help="Only solve games with at most this many configurations in their cluster", type=int)
+    parser.add_argument("--sample", help="Solve a random sample of this many of the selected games, see --seed", type=int)
     
-    # Parse the arguments and return them
-    return parser.parse_args()
+    # Parse the arguments, rejecting an engine the algorithm cannot run on
+    # before any game is solved, and return them
+    args = parser.parse_args()
+    if args.engine == "numpy" and args.algorithm.lower() not in ("bfs", "random"):
+        parser.error("the numpy engine only runs BFS and Random, please choose object or bitboard")
+    return args
 
 def main():
     """
@@ -43,7 +71,16 @@ def main():
         return
 
     # Solve the games using the specified algorithm and repeat count
-    stats, unsolved_count, solutions = solve_rush_hour_games(rush_games, args.algorithm, args.repeat)
+    stats, unsolved_count, solutions = solve_rush_hour_games(rush_games, args.algorithm, args.repeat,
+                                                args.engine, args.slide, args.astar_mode,
+                                                args.weight, args.workers, args.seed,
+                                                args.verify, args.report,
+                                                None if args.no_cache else args.cache,
+                                                args.memory_limit, args.postprocess,
+                                                args.shorten_depth, args.mcts_iterations,
+                                                args.time_limit, args.mcts_evaluate,
+                                                args.beam_width, args.beam_restarts,
+                                                None if args.no_cache else args.cluster_dir)
 
     if not stats["times"] or not stats["steps"]:
         print("No data for visualization available.")